@@ -8,8 +8,10 @@ import uuid
 from typing import List
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+from database import get_db, update_by_pk
 from models.orm import Campaign, Product
 from models.pydantic import (
     CampaignCreate,
@@ -17,9 +19,11 @@ from models.pydantic import (
     CampaignUpdate,
     CampaignRead,
     CampaignValidationResponse,
-    ProductRead
+    ProductRead,
+    read_from_orm, dump_from_orm
 )
-from services.file_manager import process_image_path
+from services.file_manager import process_image_paths
+from services.cache import invalidate_available_images
 
 
 router = APIRouter()
@@ -47,7 +51,7 @@ async def get_all_campaigns(db: Session = Depends(get_db)):
         List of all campaigns with their details.
     """
     campaigns = db.query(Campaign).all()
-    return campaigns
+    return ORJSONResponse([dump_from_orm(CampaignRead, c) for c in campaigns])
 
 
 @router.get("/campaigns/{campaign_id}", response_model=CampaignRead)
@@ -65,13 +69,13 @@ async def get_campaign(campaign_id: str, db: Session = Depends(get_db)):
     Raises:
         404: If campaign not found
     """
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Campaign with id {campaign_id} not found"
         )
-    return campaign
+    return ORJSONResponse(dump_from_orm(CampaignRead, campaign))
 
 
 @router.post("/campaigns/validate", response_model=CampaignValidationResponse)
@@ -116,14 +120,9 @@ async def create_campaign(campaign: CampaignCreate, db: Session = Depends(get_db
     Returns:
         Created campaign
     """
-    # Process brand images - download URLs if needed
+    # Process brand images concurrently - download URLs if needed
     brand_images_list = json.loads(campaign.brand_images)
-    processed_images = []
-
-    for image_path in brand_images_list:
-        if image_path:
-            processed_path = await process_image_path(image_path)
-            processed_images.append(processed_path)
+    processed_images = await process_image_paths([path for path in brand_images_list if path])
 
     # Create new campaign
     db_campaign = Campaign(
@@ -160,14 +159,10 @@ async def create_campaign_with_products(
     Returns:
         Created campaign with products included
     """
-    # Process brand images - download URLs if needed
+    # Process brand images and product images concurrently - download URLs if needed
     brand_images_list = json.loads(campaign_data.brand_images)
-    processed_images = []
-
-    for image_path in brand_images_list:
-        if image_path:
-            processed_path = await process_image_path(image_path)
-            processed_images.append(processed_path)
+    processed_images = await process_image_paths([path for path in brand_images_list if path])
+    product_images = await process_image_paths([product.image_path for product in campaign_data.products])
 
     # Create new campaign
     campaign_id = str(uuid.uuid4())
@@ -184,34 +179,30 @@ async def create_campaign_with_products(
     )
 
     db.add(db_campaign)
-    db.flush()  # Flush to get the campaign ID before creating products
+    db.flush()  # Insert the campaign row before bulk-inserting its products
 
     # Create products if provided
-    created_products = []
-    for product_data in campaign_data.products:
-        # Process product image
-        if product_data.image_path:
-            processed_image = await process_image_path(product_data.image_path)
-        else:
-            processed_image = None
-
-        db_product = Product(
-            id=str(uuid.uuid4()),
-            campaign_id=campaign_id,
-            name=product_data.name,
-            description=product_data.description,
-            image_path=processed_image
-        )
-        db.add(db_product)
-        created_products.append(db_product)
+    product_rows = []
+    for product_data, processed_image in zip(campaign_data.products, product_images):
+        product_rows.append({
+            "id": uuid.uuid4().hex,
+            "campaign_id": campaign_id,
+            "name": product_data.name,
+            "description": product_data.description,
+            "image_path": processed_image
+        })
+
+    # Single bulk INSERT for all products instead of per-object ORM adds
+    if product_rows:
+        db.execute(insert(Product), product_rows)
 
     db.commit()
-    db.refresh(db_campaign)
+    invalidate_available_images(campaign_id)
 
     # Return campaign with products
     return {
-        "campaign": CampaignRead.model_validate(db_campaign),
-        "products": [ProductRead.model_validate(p) for p in created_products]
+        "campaign": read_from_orm(CampaignRead, db_campaign),
+        "products": [ProductRead(**row) for row in product_rows]
     }
 
 
@@ -235,33 +226,31 @@ async def update_campaign(
     Raises:
         404: If campaign not found
     """
-    db_campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not db_campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign with id {campaign_id} not found"
-        )
-
     # Update only provided fields
     update_data = campaign_update.model_dump(exclude_unset=True)
 
     # Process brand images if provided
     if "brand_images" in update_data and update_data["brand_images"]:
-        brand_images_list = json.loads(update_data["brand_images"])
-        processed_images = []
+        # Confirm the campaign exists before downloading anything for it
+        if db.query(Campaign.id).filter(Campaign.id == campaign_id).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Campaign with id {campaign_id} not found"
+            )
 
-        for image_path in brand_images_list:
-            if image_path:
-                processed_path = await process_image_path(image_path)
-                processed_images.append(processed_path)
+        brand_images_list = json.loads(update_data["brand_images"])
+        processed_images = await process_image_paths([path for path in brand_images_list if path])
 
         update_data["brand_images"] = json.dumps(processed_images)
 
-    for field, value in update_data.items():
-        setattr(db_campaign, field, value)
+    db_campaign = update_by_pk(db, Campaign, campaign_id, update_data)
+    if not db_campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campaign with id {campaign_id} not found"
+        )
 
     db.commit()
-    db.refresh(db_campaign)
 
     return db_campaign
 
@@ -278,7 +267,16 @@ async def delete_campaign(campaign_id: str, db: Session = Depends(get_db)):
     Raises:
         404: If campaign not found
     """
-    db_campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    # Eager-load everything the delete cascade touches so it doesn't lazy-load per product
+    db_campaign = db.get(
+        Campaign,
+        campaign_id,
+        options=[
+            selectinload(Campaign.products).selectinload(Product.posts),
+            selectinload(Campaign.posts),
+            selectinload(Campaign.mood_media)
+        ]
+    )
     if not db_campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -287,5 +285,6 @@ async def delete_campaign(campaign_id: str, db: Session = Depends(get_db)):
 
     db.delete(db_campaign)
     db.commit()
+    invalidate_available_images(campaign_id)
 
     return None
@@ -13,36 +13,50 @@ import json
 from typing import List
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import ORJSONResponse
 
 from database import get_db
-from models.orm import ScheduledPost, Post, Campaign
+from models.orm import ScheduledPost, Post, Campaign, PendingAyrshareDelete
 from models.pydantic import (
     AyrshareProfilesResponse,
     AyrshareProfile,
     SchedulePostRequest,
-    ScheduledPostRead
+    ScheduledPostRead,
+    PostRead,
+    dump_from_orm
 )
-from services.ayrshare_service import AyrshareService
+from services.ayrshare_service import get_ayrshare_service, AyrshareUnavailableError
+from services.cache import invalidate_profiles_cache
+from services.ayrshare_delete_queue import enqueue_delete
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/deploy", tags=["deploy"])
 
 
 @router.get("/profiles", response_model=AyrshareProfilesResponse)
-async def get_connected_profiles():
+async def get_connected_profiles(refresh: bool = Query(False)):
     """
     Get all connected social media profiles from Ayrshare.
+    Pass refresh=true to bypass the short-lived profiles cache (e.g. right after linking an account).
     """
     logger.info("📱 Fetching connected social media profiles...")
 
     try:
-        ayrshare = AyrshareService()
+        if refresh:
+            invalidate_profiles_cache()
+        ayrshare = get_ayrshare_service()
         profiles = await ayrshare.get_profiles()
 
         logger.info(f"  ✓ Retrieved {len(profiles)} profiles")
         return {"profiles": [AyrshareProfile(**p) for p in profiles]}
 
+    except AyrshareUnavailableError as e:
+        logger.error(f"❌ Ayrshare unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"❌ Failed to fetch profiles: {str(e)}")
         raise HTTPException(
@@ -66,7 +80,7 @@ async def schedule_post(
     logger.info(f"📅 Scheduling post {request.post_id} ({request.schedule_type})...")
 
     # Validate post exists
-    post = db.query(Post).filter(Post.id == request.post_id).first()
+    post = db.get(Post, request.post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,7 +88,7 @@ async def schedule_post(
         )
 
     # Validate campaign exists
-    campaign = db.query(Campaign).filter(Campaign.id == request.campaign_id).first()
+    campaign = db.get(Campaign, request.campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -103,7 +117,7 @@ async def schedule_post(
         )
 
     try:
-        ayrshare = AyrshareService()
+        ayrshare = get_ayrshare_service()
 
         # Build post text (caption + body_text)
         post_text = f"{post.caption}\n\n{post.body_text}".strip()
@@ -185,6 +199,12 @@ async def schedule_post(
         scheduled_post.post = post
         return scheduled_post
 
+    except AyrshareUnavailableError as e:
+        logger.error(f"❌ Ayrshare unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except ValueError as e:
         logger.error(f"❌ Validation error: {str(e)}")
         raise HTTPException(
@@ -210,25 +230,29 @@ async def list_scheduled_posts(
     logger.info(f"📋 Fetching scheduled posts for campaign {campaign_id}...")
 
     # Validate campaign exists
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Campaign {campaign_id} not found"
         )
 
-    # Get scheduled posts with nested post data
+    # Get scheduled posts with nested post data in a single LEFT OUTER JOIN query
     scheduled_posts = db.query(ScheduledPost)\
+        .options(joinedload(ScheduledPost.post))\
         .filter(ScheduledPost.campaign_id == campaign_id)\
         .order_by(ScheduledPost.created_at.desc())\
         .all()
 
-    # Attach post data
+    logger.info(f"  ✓ Found {len(scheduled_posts)} scheduled posts")
+
+    response = []
     for sp in scheduled_posts:
-        sp.post = db.query(Post).filter(Post.id == sp.post_id).first()
+        item = dump_from_orm(ScheduledPostRead, sp)
+        item["post"] = dump_from_orm(PostRead, sp.post) if sp.post else None
+        response.append(item)
 
-    logger.info(f"  ✓ Found {len(scheduled_posts)} scheduled posts")
-    return scheduled_posts
+    return ORJSONResponse(response)
 
 
 @router.delete("/scheduled-posts/{scheduled_post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -238,7 +262,8 @@ async def cancel_scheduled_post(
 ):
     """
     Cancel/delete a scheduled post.
-    Deletes from both Ayrshare and local database.
+    Deletes from the local database immediately; the Ayrshare delete is queued
+    and sent in the background.
     """
     logger.info(f"🗑️ Canceling scheduled post {scheduled_post_id}...")
 
@@ -254,16 +279,19 @@ async def cancel_scheduled_post(
         )
 
     try:
-        # Delete from Ayrshare if we have an ID
-        if scheduled_post.ayrshare_post_id:
-            ayrshare = AyrshareService()
-            await ayrshare.delete_post(scheduled_post.ayrshare_post_id)
-            logger.info("  ✓ Deleted from Ayrshare")
+        # Record the Ayrshare delete in the same transaction as the local delete
+        ayrshare_post_id = scheduled_post.ayrshare_post_id
+        if ayrshare_post_id:
+            db.merge(PendingAyrshareDelete(ayrshare_post_id=ayrshare_post_id))
 
         # Delete from database
         db.delete(scheduled_post)
         db.commit()
 
+        if ayrshare_post_id:
+            enqueue_delete(ayrshare_post_id)
+            logger.info("  ✓ Queued Ayrshare delete")
+
         logger.info("✅ Successfully canceled scheduled post")
         return None
 
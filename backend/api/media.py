@@ -3,7 +3,7 @@ Media API router for file uploads.
 """
 from typing import List
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from services.file_manager import save_uploaded_file
+from services.file_manager import save_uploaded_file, UnsupportedMediaTypeError
 
 
 router = APIRouter()
@@ -22,8 +22,15 @@ async def upload_media(file: UploadFile = File(...)):
 
     Raises:
         400: If file type not allowed or upload failed
+        415: If the file contents don't match its image extension
     """
-    file_path = await save_uploaded_file(file)
+    try:
+        file_path = await save_uploaded_file(file)
+    except UnsupportedMediaTypeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
 
     if not file_path:
         raise HTTPException(
@@ -52,7 +59,11 @@ async def upload_multiple_media(files: List[UploadFile] = File(...)):
     errors = []
 
     for file in files:
-        file_path = await save_uploaded_file(file)
+        try:
+            file_path = await save_uploaded_file(file)
+        except UnsupportedMediaTypeError as e:
+            errors.append(str(e))
+            continue
         if file_path:
             uploaded_paths.append(file_path)
         else:
@@ -9,37 +9,67 @@ import json
 from typing import List
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models.orm import MoodMedia, Campaign, Product
+from database import get_db, SessionLocal
+from models.orm import MoodMedia, Campaign
 from models.pydantic import (
     MoodMediaRead,
     MoodImageGenerateRequest,
     MoodVideoGenerateRequest,
     MoodAvailableImagesResponse,
-    ProductRead
+    dump_from_orm
 )
 from services import mood_service, file_manager
+from services.cache import invalidate_available_images
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/moods", tags=["moods"])
 
+# Rows fetched from the DB cursor (and encoded into one response chunk) at a time
+MOOD_MEDIA_STREAM_BATCH = 500
+
+
+def _stream_mood_media(campaign_id: str):
+    """
+    Yield the campaign's mood media as a JSON array, one encoded batch at a time.
+
+    Uses its own session so rows keep streaming from the cursor after the
+    endpoint has returned; the full list is never held in memory.
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(MoodMedia)
+            .where(MoodMedia.campaign_id == campaign_id)
+            .order_by(MoodMedia.created_at.desc())
+            .execution_options(yield_per=MOOD_MEDIA_STREAM_BATCH)
+        ).scalars()
+
+        yield b"["
+        count = 0
+        for partition in rows.partitions():
+            encoded = b",".join(orjson.dumps(dump_from_orm(MoodMediaRead, m)) for m in partition)
+            yield encoded if count == 0 else b"," + encoded
+            count += len(partition)
+        yield b"]"
+
+        logger.info(f"  ✓ Streamed {count} mood media items")
+    finally:
+        db.close()
+
 
 @router.get("", response_model=List[MoodMediaRead])
-async def list_mood_media(campaign_id: str, db: Session = Depends(get_db)):
+async def list_mood_media(campaign_id: str):
     """
     Get all mood media for a campaign, ordered by created_at descending (newest first).
     """
     logger.info(f"📋 Fetching mood media for campaign {campaign_id}")
 
-    media = db.query(MoodMedia)\
-        .filter(MoodMedia.campaign_id == campaign_id)\
-        .order_by(MoodMedia.created_at.desc())\
-        .all()
-
-    logger.info(f"  ✓ Found {len(media)} mood media items")
-    return media
+    return StreamingResponse(_stream_mood_media(campaign_id), media_type="application/json")
 
 
 @router.post("/images/generate", response_model=List[MoodMediaRead])
@@ -91,6 +121,7 @@ async def generate_mood_images(
             ratios=request.ratios,
             db=db
         )
+        invalidate_available_images(request.campaign_id)
 
         logger.info(f"✅ Successfully generated {len(mood_media_list)} mood images")
         return mood_media_list
@@ -220,7 +251,7 @@ async def upload_mood_media(
         )
 
     # Get campaign for name sanitization
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -240,11 +271,9 @@ async def upload_mood_media(
         ext = file.filename.split(".")[-1] if "." in file.filename else ("mp4" if is_video else "png")
         filename = f"{campaign_name}_upload_{date_stamp}.{ext}"
 
-        # Save file locally
-        if is_image:
-            file_path = file_manager.save_mood_image(file_data, filename)
-        else:
-            file_path = file_manager.save_mood_video(file_data, filename)
+        # Save file locally (off the event loop; videos can be tens of MB)
+        save = file_manager.save_mood_image if is_image else file_manager.save_mood_video
+        file_path = await file_manager.run_file_io(save, file_data, filename)
 
         logger.info(f"  ✓ Saved locally: {file_path}")
 
@@ -265,6 +294,7 @@ async def upload_mood_media(
         db.add(mood_media)
         db.commit()
         db.refresh(mood_media)
+        invalidate_available_images(campaign_id)
 
         logger.info("✅ Successfully uploaded mood media")
         return mood_media
@@ -285,7 +315,7 @@ async def delete_mood_media(mood_id: str, db: Session = Depends(get_db)):
     logger.info(f"🗑️ Deleting mood media {mood_id}")
 
     # Get mood media
-    mood = db.query(MoodMedia).filter(MoodMedia.id == mood_id).first()
+    mood = db.get(MoodMedia, mood_id)
     if not mood:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -294,11 +324,13 @@ async def delete_mood_media(mood_id: str, db: Session = Depends(get_db)):
 
     try:
         # Delete file from local filesystem
-        file_manager.delete_mood_file(mood.file_path)
+        await file_manager.run_file_io(file_manager.delete_mood_file, mood.file_path)
 
         # Delete DB entry
+        campaign_id = mood.campaign_id
         db.delete(mood)
         db.commit()
+        invalidate_available_images(campaign_id)
 
         logger.info("✅ Successfully deleted mood media")
         return None
@@ -320,20 +352,4 @@ async def get_available_images(campaign_id: str, db: Session = Depends(get_db)):
     """
     logger.info(f"📷 Fetching available images for campaign {campaign_id}")
 
-    # Get products for this campaign
-    products = db.query(Product)\
-        .filter(Product.campaign_id == campaign_id)\
-        .all()
-
-    # Get existing mood images (exclude videos)
-    mood_images = db.query(MoodMedia)\
-        .filter(MoodMedia.campaign_id == campaign_id)\
-        .filter(MoodMedia.media_type == "image")\
-        .all()
-
-    logger.info(f"  ✓ Found {len(products)} products, {len(mood_images)} mood images")
-
-    return {
-        "products": [ProductRead.from_orm(p) for p in products],
-        "mood_images": [MoodMediaRead.from_orm(m) for m in mood_images]
-    }
+    return ORJSONResponse(mood_service.get_available_images(campaign_id, db))
@@ -3,29 +3,43 @@ Posts API router for CRUD operations and AI post generation.
 """
 import uuid
 import json
+import asyncio
 import re
+import time
+import random
 import logging
 import shutil
+from io import BytesIO
 from pathlib import Path
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from PIL import Image as PILImage
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, update_by_pk
 from models.orm import Post, Campaign, Product, MoodMedia
 from models.pydantic import (
     PostCreate, PostUpdate, PostRead, PostGenerateRequest, PostRegenerateRequest,
-    MoodAvailableImagesResponse, ProductRead, MoodMediaRead
+    MoodAvailableImagesResponse, dump_from_orm
 )
-from services.gemini_service import GeminiService
+from services.gemini_service import get_gemini_service
 from services.image_compositor import ImageCompositor
+from services import mood_service
 
-# Configure logging
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 
 router = APIRouter()
 
+# Base directories (resolved once at import)
+FILES_DIR = Path(__file__).resolve().parent.parent.parent / "files"
+POSTS_DIR = FILES_DIR / "posts"
+
+# Fast PNG encoding for post images (zlib level 1 instead of the default 6)
+PNG_COMPRESS_LEVEL = 1
+
 ASPECT_RATIO_MAP = {
     "1:1": "1-1",
     "16:9": "16-9",
@@ -48,17 +62,63 @@ def _sanitize_filename(name: str) -> str:
     return name.strip('_')
 
 
+def _encode_post_cursor(post: Post) -> str:
+    """Encode a post's (created_at, id) sort key as an opaque page cursor."""
+    return f"{post.created_at.isoformat()}|{post.id}"
+
+
+def _decode_post_cursor(cursor: str):
+    """Decode a page cursor back into its (created_at, id) sort key."""
+    try:
+        created_at, post_id = cursor.split("|", 1)
+        return datetime.fromisoformat(created_at), post_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {cursor}"
+        )
+
+
+def _raise_first_failure(results: dict) -> dict:
+    """Re-raise the first exception in a gathered {key: result} mapping, else return it."""
+    for result in results.values():
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
 @router.get("/posts", response_model=List[PostRead])
-async def get_posts(campaign_id: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_posts(
+    campaign_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Get all posts, optionally filtered by campaign_id.
+    Get all posts, optionally filtered by campaign_id, newest first.
+
+    Pass limit to page with a keyset cursor: when more posts remain, the
+    X-Next-Cursor response header holds the value to send as cursor for the
+    next page. Seeking on (created_at, id) keeps every page an index range scan.
     """
     query = db.query(Post)
     if campaign_id:
         query = query.filter(Post.campaign_id == campaign_id)
+    if cursor:
+        query = query.filter(tuple_(Post.created_at, Post.id) < tuple_(*_decode_post_cursor(cursor)))
 
-    posts = query.order_by(Post.created_at.desc()).all()
-    return posts
+    query = query.order_by(Post.created_at.desc(), Post.id.desc())
+    if limit is None:
+        posts = query.all()
+        headers = None
+    else:
+        # Fetch one extra row to learn whether another page exists
+        posts = query.limit(limit + 1).all()
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+        headers = {"X-Next-Cursor": _encode_post_cursor(posts[-1])} if has_more else None
+
+    return ORJSONResponse([dump_from_orm(PostRead, p) for p in posts], headers=headers)
 
 
 @router.get("/posts/available-images", response_model=MoodAvailableImagesResponse)
@@ -77,23 +137,7 @@ async def get_available_images(campaign_id: str, db: Session = Depends(get_db)):
     """
     logger.info(f"📷 Fetching available images for post generation (campaign {campaign_id})")
 
-    # Get products for this campaign
-    products = db.query(Product)\
-        .filter(Product.campaign_id == campaign_id)\
-        .all()
-
-    # Get existing mood images (exclude videos)
-    mood_images = db.query(MoodMedia)\
-        .filter(MoodMedia.campaign_id == campaign_id)\
-        .filter(MoodMedia.media_type == "image")\
-        .all()
-
-    logger.info(f"  ✓ Found {len(products)} products, {len(mood_images)} mood images")
-
-    return {
-        "products": [ProductRead.from_orm(p) for p in products],
-        "mood_images": [MoodMediaRead.from_orm(m) for m in mood_images]
-    }
+    return ORJSONResponse(mood_service.get_available_images(campaign_id, db))
 
 
 @router.get("/posts/{post_id}", response_model=PostRead)
@@ -101,10 +145,10 @@ async def get_post(post_id: str, db: Session = Depends(get_db)):
     """
     Get a single post by ID.
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return ORJSONResponse(dump_from_orm(PostRead, post))
 
 
 @router.post("/posts", response_model=PostRead, status_code=status.HTTP_201_CREATED)
@@ -113,11 +157,11 @@ async def create_post(post_data: PostCreate, db: Session = Depends(get_db)):
     Create a new post manually (without AI generation).
     """
     # Verify campaign and product exist
-    campaign = db.query(Campaign).filter(Campaign.id == post_data.campaign_id).first()
+    campaign = db.get(Campaign, post_data.campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    product = db.query(Product).filter(Product.id == post_data.product_id).first()
+    product = db.get(Product, post_data.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -144,7 +188,11 @@ async def create_post(post_data: PostCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/posts/generate", response_model=PostRead, status_code=status.HTTP_201_CREATED)
-async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_db)):
+async def generate_post(
+    request: PostGenerateRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Generate a post using AI (Gemini for text and images).
 
@@ -156,25 +204,22 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
        - Multiple images: Composition/blend
     4. Add random logo overlay and border to images
     5. Save post to database with source tracking
+    6. Persist thumbnail variants in the background
     """
-    logger.info(f"🚀 Starting post generation for campaign: {request.campaign_id}")
-    logger.info(f"   📸 Source images: {request.source_images}")
+    started = time.perf_counter()
+    logger.debug("🚀 Starting post generation for campaign: %s", request.campaign_id)
+    logger.debug("   📸 Source images: %s", request.source_images)
 
     # 1. Fetch campaign data
-    logger.info("Step 1: Fetching campaign data...")
-    campaign = db.query(Campaign).filter(Campaign.id == request.campaign_id).first()
+    logger.debug("Step 1: Fetching campaign data...")
+    campaign = db.get(Campaign, request.campaign_id)
     if not campaign:
         logger.error(f"  Campaign not found: {request.campaign_id}")
         raise HTTPException(status_code=404, detail="Campaign not found")
-    logger.info(f"  Campaign found: {campaign.name}")
+    logger.debug("  Campaign found: %s", campaign.name)
 
     # 2. Load source images and determine their origins
-    logger.info(f"Step 2: Loading {len(request.source_images)} source image(s)...")
-    from PIL import Image as PILImage
-    from pathlib import Path
-    import random
-
-    files_dir = Path(__file__).resolve().parent.parent.parent / "files"
+    logger.debug("Step 2: Loading %s source image(s)...", len(request.source_images))
     source_pil_images = []
     product_id = None  # Track if source is from a product
     mood_id = None  # Track if source is from mood board
@@ -198,12 +243,12 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
 
         # For loading from filesystem, strip /static/ prefix if present
         clean_path = img_path.lstrip('/').lstrip('static/')
-        img_full_path = files_dir / clean_path
+        img_full_path = FILES_DIR / clean_path
 
         if img_full_path.exists():
-            pil_img = PILImage.open(img_full_path)
+            pil_img = ImageCompositor.open_source_image(img_full_path)
             source_pil_images.append(pil_img)
-            logger.info(f"   Loaded: {clean_path} ({pil_img.size})")
+            logger.debug("   Loaded: %s (%s)", clean_path, pil_img.size)
         else:
             logger.error(f"   ❌ Image not found: {clean_path}")
             raise HTTPException(status_code=404, detail=f"Source image not found: {clean_path}")
@@ -211,19 +256,19 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
     if not source_pil_images:
         raise HTTPException(status_code=400, detail="No valid source images provided")
 
-    logger.info(f"Loaded {len(source_pil_images)} source image(s)")
-    logger.info(f"  product_id: {product_id}, mood_id: {mood_id}")
+    logger.debug("Loaded %s source image(s)", len(source_pil_images))
+    logger.debug("  product_id: %s, mood_id: %s", product_id, mood_id)
 
     try:
         # 3. Generate text content using Gemini
-        logger.info("Step 3: Generating text content with Gemini 2.5 Flash...")
-        gemini_service = GeminiService()
+        logger.debug("Step 3: Generating text content with Gemini 2.5 Flash...")
+        gemini_service = get_gemini_service()
 
         # Get product info if available, otherwise use generic description
         product_name = None
         product_description = None
         if product_id:
-            product = db.query(Product).filter(Product.id == product_id).first()
+            product = db.get(Product, product_id)
             if product:
                 product_name = product.name
                 product_description = product.description
@@ -243,12 +288,12 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
         caption = text_content["caption"]
         text_color = text_content["text_color"]
 
-        logger.info("Text generated successfully!")
-        logger.info(f"   Headline: {headline}")
-        logger.info(f"   Text Color: {text_color}")
+        logger.debug("Text generated successfully!")
+        logger.debug("   Headline: %s", headline)
+        logger.debug("   Text Color: %s", text_color)
 
         # 4. Generate images for selected aspect ratios using Gemini + compositing
-        logger.info(f"Step 4: Generating images for {len(request.aspect_ratios)} aspect ratio(s)...")
+        logger.debug("Step 4: Generating images for %s aspect ratio(s)...", len(request.aspect_ratios))
 
         # RANDOM LOGO SELECTION - Pick once, use for all aspect ratios
         image_compositor = ImageCompositor()
@@ -256,11 +301,11 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
         selected_brand_logo = random.choice(brand_images) if brand_images else None
 
         if selected_brand_logo:
-            logger.info(f"   Randomly selected brand logo: {selected_brand_logo}")
+            logger.debug("   Randomly selected brand logo: %s", selected_brand_logo)
         else:
-            logger.info("   No brand images available for logo overlay")
+            logger.debug("   No brand images available for logo overlay")
 
-        logger.info(f"   Will generate from {len(source_pil_images)} source image(s)")
+        logger.debug("   Will generate from %s source image(s)", len(source_pil_images))
 
         image_paths = {}
 
@@ -270,6 +315,7 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
         # Track the first generated image for consistency across aspect ratios
         base_generated_image = None
         first_aspect_ratio = True
+        adapted_images = {}
 
         for aspect_ratio in request.aspect_ratios:
             if aspect_ratio not in ASPECT_RATIO_MAP:
@@ -278,27 +324,41 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
                     detail=f"Invalid aspect ratio: {aspect_ratio}. Must be one of: 1:1, 16:9, 9:16"
                 )
 
-            logger.info(f"   Processing {aspect_ratio} image...")
+        # Composition without local reframing: compose every ratio in one concurrent
+        # batch that shares the same loaded source images
+        composed_images = {}
+        if use_composition and not request.use_local_reframe:
+            logger.debug("      Step 4a: Composing %s images with Gemini for all ratios...", len(request.source_images))
+            composed_bytes = await gemini_service.generate_mood_images(
+                source_images=request.source_images,
+                prompt=f"{campaign.campaign_message}. {request.prompt}. Headline: {headline}",
+                aspect_ratios=request.aspect_ratios
+            )
+            composed_images = dict(zip(request.aspect_ratios, composed_bytes))
+
+        for aspect_ratio in request.aspect_ratios:
+            logger.debug("   Processing %s image...", aspect_ratio)
 
             # Step 4a: Generate image with Gemini
-            if first_aspect_ratio:
+            if aspect_ratio in composed_images:
+                generated_image = PILImage.open(BytesIO(composed_images[aspect_ratio]))
+            elif first_aspect_ratio:
                 if use_composition:
                     # COMPOSITION: Blend multiple source images
                     # generate_mood_image returns bytes, convert to PIL Image
-                    logger.info(f"      Step 4a: Composing {len(request.source_images)} images with Gemini...")
+                    logger.debug("      Step 4a: Composing %s images with Gemini...", len(request.source_images))
                     image_bytes = await gemini_service.generate_mood_image(
                         source_images=request.source_images,  # Pass paths as strings
                         prompt=f"{campaign.campaign_message}. {request.prompt}. Headline: {headline}",
                         aspect_ratio=aspect_ratio
                     )
                     # Convert bytes to PIL Image
-                    from io import BytesIO
                     generated_image = PILImage.open(BytesIO(image_bytes))
-                    logger.info("      Composition generated!")
+                    logger.debug("      Composition generated!")
                 else:
                     # IMG2IMG: Transform single source image
                     # generate_product_image returns PIL Image directly
-                    logger.info("      Step 4a: Transforming source image with Gemini...")
+                    logger.debug("      Step 4a: Transforming source image with Gemini...")
                     generated_image = await gemini_service.generate_product_image(
                         product_image=source_pil_images[0],  # Pass PIL object
                         campaign_message=campaign.campaign_message,
@@ -306,25 +366,42 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
                         user_prompt=request.prompt,
                         aspect_ratio=aspect_ratio
                     )
-                    logger.info("      ✅ Image transformed!")
+                    logger.debug("      ✅ Image transformed!")
 
                 base_generated_image = generated_image
                 first_aspect_ratio = False
-            else:
-                # Subsequent ratios: Adapt the base image to new aspect ratio
-                logger.info(f"      Step 4a: Adapting base image to {aspect_ratio}...")
-                generated_image = await gemini_service.generate_product_image_adaptation(
-                    base_image=base_generated_image,
-                    headline=headline,
-                    new_aspect_ratio=aspect_ratio
+
+                # Adapt the base to every remaining ratio concurrently
+                if not request.use_local_reframe:
+                    remaining_ratios = [
+                        ratio for ratio in dict.fromkeys(request.aspect_ratios)
+                        if ratio != aspect_ratio and ratio not in composed_images
+                    ]
+                    if remaining_ratios:
+                        logger.debug("      Step 4a: Adapting base image to %s...", remaining_ratios)
+                        adapted_images = _raise_first_failure(dict(zip(
+                            remaining_ratios,
+                            await gemini_service.generate_all_aspect_ratios(
+                                base_generated_image, headline, remaining_ratios
+                            )
+                        )))
+                        logger.debug("      ✅ Images adapted!")
+            elif request.use_local_reframe:
+                # Subsequent ratios: Reframe the base image locally (no extra Gemini call)
+                logger.debug("      Step 4a: Reframing base image to %s...", aspect_ratio)
+                generated_image = await asyncio.to_thread(
+                    image_compositor.reframe, base_generated_image, aspect_ratio
                 )
-                logger.info("      ✅ Image adapted!")
+                logger.debug("      ✅ Image reframed!")
+            else:
+                # Subsequent ratios: base image already adapted to this ratio above
+                generated_image = adapted_images.get(aspect_ratio, base_generated_image)
 
             filename_ratio = ASPECT_RATIO_MAP[aspect_ratio]
             output_filename = f"image_{filename_ratio}.png"
 
             # Step 4b: Composite logo and border onto Gemini image
-            logger.info("      Step 4b: Adding logo and border...")
+            logger.debug("      Step 4b: Adding logo and border...")
 
             image_path = await image_compositor.create_post_image(
                 aspect_ratio=aspect_ratio,
@@ -332,14 +409,15 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
                 brand_logo=selected_brand_logo,  # Pass single selected logo instead of array
                 campaign_name=campaign.name,
                 post_headline=headline,
-                output_filename=output_filename
+                output_filename=output_filename,
+                png_compress_level=PNG_COMPRESS_LEVEL
             )
 
             image_paths[aspect_ratio] = image_path
-            logger.info(f"   ✅ {aspect_ratio} image complete and saved to: {image_path}")
+            logger.debug("   ✅ %s image complete and saved to: %s", aspect_ratio, image_path)
 
         # 5. Create Post record in DB
-        logger.info("Step 5: Saving post to database...")
+        logger.debug("Step 5: Saving post to database...")
         post_id = str(uuid.uuid4())
         db_post = Post(
             id=post_id,
@@ -361,7 +439,22 @@ async def generate_post(request: PostGenerateRequest, db: Session = Depends(get_
         db.commit()
         db.refresh(db_post)
 
-        logger.info(f"Post generation complete! Post ID: {post_id}")
+        # 6. Thumbnail variants are generated after the response is sent
+        background_tasks.add_task(image_compositor.create_variants, list(image_paths.values()))
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            "post.generate post_id=%s duration_ms=%d", post_id, duration_ms,
+            extra={
+                "post_id": post_id,
+                "campaign_id": request.campaign_id,
+                "n_sources": len(source_pil_images),
+                "aspect_ratios": request.aspect_ratios,
+                "product_id": product_id,
+                "mood_id": mood_id,
+                "duration_ms": duration_ms,
+            }
+        )
         return db_post
 
     except ValueError as _:
@@ -379,30 +472,12 @@ async def update_post(post_id: str, post_data: PostUpdate, db: Session = Depends
     """
     Update an existing post.
     """
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+    # Update fields if provided (None means "leave unchanged")
+    db_post = update_by_pk(db, Post, post_id, post_data.model_dump(exclude_none=True))
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    # Update fields if provided
-    if post_data.headline is not None:
-        db_post.headline = post_data.headline
-    if post_data.body_text is not None:
-        db_post.body_text = post_data.body_text
-    if post_data.caption is not None:
-        db_post.caption = post_data.caption
-    if post_data.text_color is not None:
-        db_post.text_color = post_data.text_color
-    if post_data.image_1_1 is not None:
-        db_post.image_1_1 = post_data.image_1_1
-    if post_data.image_16_9 is not None:
-        db_post.image_16_9 = post_data.image_16_9
-    if post_data.image_9_16 is not None:
-        db_post.image_9_16 = post_data.image_9_16
-    if post_data.generation_prompt is not None:
-        db_post.generation_prompt = post_data.generation_prompt
-
     db.commit()
-    db.refresh(db_post)
 
     return db_post
 
@@ -411,25 +486,27 @@ async def update_post(post_id: str, post_data: PostUpdate, db: Session = Depends
 async def regenerate_post_images(
     post_id: str,
     request: PostRegenerateRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Regenerate images for an existing post with new settings.
     Deletes old images and generates new ones.
     """
-    logger.info(f"🔄 Starting image regeneration for post {post_id}")
+    started = time.perf_counter()
+    logger.debug("🔄 Starting image regeneration for post %s", post_id)
 
     # 1. Get the post
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+    db_post = db.get(Post, post_id)
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
 
     # 2. Get campaign and product
-    campaign = db.query(Campaign).filter(Campaign.id == db_post.campaign_id).first()
+    campaign = db.get(Campaign, db_post.campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    product = db.query(Product).filter(Product.id == request.product_id).first()
+    product = db.get(Product, request.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -438,49 +515,44 @@ async def regenerate_post_images(
     safe_headline = _sanitize_filename(db_post.headline)[:50]
     folder_name = f"{safe_campaign}_{safe_headline}"
 
-    base_dir = Path(__file__).resolve().parent.parent.parent
-    files_dir = base_dir / "files"
-    posts_dir = files_dir / "posts"
-    post_folder = posts_dir / folder_name
+    post_folder = POSTS_DIR / folder_name
 
     if post_folder.exists() and post_folder.is_dir():
         try:
             shutil.rmtree(post_folder)
-            logger.info(f"   🗑️  Deleted old images folder: {post_folder}")
+            logger.debug("   🗑️  Deleted old images folder: %s", post_folder)
         except Exception as e:
             logger.error(f"   ⚠️  Failed to delete old folder: {str(e)}")
 
     try:
         # 4. Load product image
-        from PIL import Image as PILImage
-        import random
-
         if product.image_path:
-            logger.info(f"   Loading product image: {product.image_path}")
-            product_img_path = files_dir / product.image_path.lstrip('/static/')
-            product_pil_image = PILImage.open(product_img_path)
-            logger.info(f"   Product image loaded: {product_pil_image.size}")
+            logger.debug("   Loading product image: %s", product.image_path)
+            product_img_path = FILES_DIR / product.image_path.lstrip('/static/')
+            product_pil_image = ImageCompositor.open_source_image(product_img_path)
+            logger.debug("   Product image loaded: %s", product_pil_image.size)
         else:
             product_pil_image = None
-            logger.info("   No product image available")
+            logger.debug("   No product image available")
 
         # 5. Generate new images using existing headline, body, caption, color
-        gemini_service = GeminiService()
+        gemini_service = get_gemini_service()
         image_compositor = ImageCompositor()
         brand_images = json.loads(campaign.brand_images) if campaign.brand_images else []
 
         # RANDOM LOGO SELECTION - Pick once, use for all aspect ratios
         selected_brand_logo = random.choice(brand_images) if brand_images else None
         if selected_brand_logo:
-            logger.info(f"   Randomly selected brand logo: {selected_brand_logo}")
+            logger.debug("   Randomly selected brand logo: %s", selected_brand_logo)
         else:
-            logger.info("   No brand images available for logo overlay")
+            logger.debug("   No brand images available for logo overlay")
 
         image_paths = {}
 
         # Track the first generated image for consistency
         base_generated_image = None
         first_aspect_ratio = True
+        adapted_images = {}
 
         for aspect_ratio in request.aspect_ratios:
             if aspect_ratio not in ASPECT_RATIO_MAP:
@@ -489,12 +561,12 @@ async def regenerate_post_images(
                     detail=f"Invalid aspect ratio: {aspect_ratio}"
                 )
 
-            logger.info(f"   Processing {aspect_ratio} image...")
+            logger.debug("   Processing %s image...", aspect_ratio)
 
             # Generate or adapt image
             if product_pil_image:
                 if first_aspect_ratio:
-                    logger.info("      Generating base image from product...")
+                    logger.debug("      Generating base image from product...")
                     generated_image = await gemini_service.generate_product_image(
                         product_image=product_pil_image,
                         campaign_message=campaign.campaign_message,
@@ -504,35 +576,48 @@ async def regenerate_post_images(
                     )
                     base_generated_image = generated_image
                     first_aspect_ratio = False
-                    logger.info("      ✅ Base image generated!")
-                else:
-                    logger.info(f"      Adapting base image to {aspect_ratio}...")
-                    generated_image = await gemini_service.generate_product_image_adaptation(
-                        base_image=base_generated_image,
-                        headline=db_post.headline,
-                        new_aspect_ratio=aspect_ratio
+                    logger.debug("      ✅ Base image generated!")
+
+                    # Adapt the base to every remaining ratio concurrently
+                    remaining_ratios = [ratio for ratio in dict.fromkeys(request.aspect_ratios) if ratio != aspect_ratio]
+                    if remaining_ratios and not request.use_local_reframe:
+                        logger.debug("      Adapting base image to %s...", remaining_ratios)
+                        adapted_images = _raise_first_failure(dict(zip(
+                            remaining_ratios,
+                            await gemini_service.generate_all_aspect_ratios(
+                                base_generated_image, db_post.headline, remaining_ratios
+                            )
+                        )))
+                        logger.debug("      ✅ Images adapted!")
+                elif request.use_local_reframe:
+                    logger.debug("      Reframing base image to %s...", aspect_ratio)
+                    generated_image = await asyncio.to_thread(
+                        image_compositor.reframe, base_generated_image, aspect_ratio
                     )
-                    logger.info("      ✅ Image adapted!")
+                    logger.debug("      ✅ Image reframed!")
+                else:
+                    generated_image = adapted_images.get(aspect_ratio, base_generated_image)
             else:
                 generated_image = None
-                logger.info("      No product image")
+                logger.debug("      No product image")
 
             filename_ratio = ASPECT_RATIO_MAP[aspect_ratio]
             output_filename = f"image_{filename_ratio}.png"
 
             # Composite logo and border
-            logger.info("      Adding logo and border...")
+            logger.debug("      Adding logo and border...")
             image_path = await image_compositor.create_post_image(
                 aspect_ratio=aspect_ratio,
                 generated_image=generated_image,
                 brand_logo=selected_brand_logo,
                 campaign_name=campaign.name,
                 post_headline=db_post.headline,
-                output_filename=output_filename
+                output_filename=output_filename,
+                png_compress_level=PNG_COMPRESS_LEVEL
             )
 
             image_paths[aspect_ratio] = image_path
-            logger.info(f"   ✅ {aspect_ratio} image saved to: {image_path}")
+            logger.debug("   ✅ %s image saved to: %s", aspect_ratio, image_path)
 
         # 6. Update post with new image paths and prompt
         db_post.image_1_1 = image_paths.get("1:1")
@@ -543,7 +628,19 @@ async def regenerate_post_images(
         db.commit()
         db.refresh(db_post)
 
-        logger.info(f"🎉 Image regeneration complete for post {post_id}")
+        background_tasks.add_task(image_compositor.create_variants, list(image_paths.values()))
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            "post.regenerate post_id=%s duration_ms=%d", post_id, duration_ms,
+            extra={
+                "post_id": post_id,
+                "campaign_id": db_post.campaign_id,
+                "product_id": request.product_id,
+                "aspect_ratios": request.aspect_ratios,
+                "duration_ms": duration_ms,
+            }
+        )
         return db_post
 
     except Exception as e:
@@ -556,12 +653,12 @@ async def delete_post(post_id: str, db: Session = Depends(get_db)):
     """
     Delete a post and its associated images from both database and filesystem.
     """
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+    db_post = db.get(Post, post_id)
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
 
     # Get campaign to construct folder path
-    campaign = db.query(Campaign).filter(Campaign.id == db_post.campaign_id).first()
+    campaign = db.get(Campaign, db_post.campaign_id)
 
     if campaign:
         # Construct the folder path using same logic as ImageCompositor
@@ -570,10 +667,7 @@ async def delete_post(post_id: str, db: Session = Depends(get_db)):
         folder_name = f"{safe_campaign}_{safe_headline}"
 
         # Build full path to post folder
-        base_dir = Path(__file__).resolve().parent.parent.parent
-        files_dir = base_dir / "files"
-        posts_dir = files_dir / "posts"
-        post_folder = posts_dir / folder_name
+        post_folder = POSTS_DIR / folder_name
 
         # Delete folder if it exists
         if post_folder.exists() and post_folder.is_dir():
@@ -4,33 +4,66 @@ Products API router.
 Handles all product-related CRUD endpoints.
 """
 import uuid
+import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, update_by_pk
 from models.orm import Product, Campaign
 from models.pydantic import (
     ProductCreate, ProductUpdate, ProductRead, ProductValidationResponse,
-    ProductBatchCreate, ProductBatchValidationResponse, ProductRegenerateImageRequest
+    ProductBatchCreate, ProductBatchValidationResponse, ProductRegenerateImageRequest,
+    dump_from_orm
 )
-from services.file_manager import process_image_path, save_generated_product_image
-from services.gemini_service import GeminiService
+from services.file_manager import process_image_path, process_image_paths, save_generated_product_image
+from services.gemini_service import get_gemini_service
+from services.cache import invalidate_available_images
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Fields a product upload must provide (ordered for stable error messages)
+REQUIRED_PRODUCT_FIELDS = ("name", "campaign_id")
+
+# Bound concurrent image downloads during batch creation so remote hosts aren't hammered
+IMAGE_DOWNLOAD_CONCURRENCY = 8
+
+
+def _paginate(query, limit: Optional[int], offset: int):
+    """
+    Apply optional limit/offset paging to a product query.
+    Without a limit the full list is returned so existing clients keep working.
+    Ordering by id keeps pages stable, so rows don't overlap or go missing.
+    """
+    query = query.order_by(Product.id)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
 
 @router.get("/products", response_model=List[ProductRead])
-async def get_products(campaign_id: Optional[str] = Query(None), db: Session = Depends(get_db)):
+async def get_products(
+    campaign_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
     """
     Get all products, optionally filtered by campaign_id.
+    Pass limit/offset to page through large result sets.
     """
     query = db.query(Product)
     if campaign_id:
         query = query.filter(Product.campaign_id == campaign_id)
 
-    products = query.all()
-    return products
+    products = _paginate(query, limit, offset).all()
+    return ORJSONResponse([dump_from_orm(ProductRead, p) for p in products])
 
 
 @router.post("/products/validate", response_model=ProductValidationResponse)
@@ -39,8 +72,7 @@ async def validate_product(data: dict = Body(...)):
     Validate product data from JSON upload.
     Returns partial data and missing required fields.
     """
-    required_fields = ["name", "campaign_id"]
-    missing_fields = [field for field in required_fields if not data.get(field)]
+    missing_fields = [field for field in REQUIRED_PRODUCT_FIELDS if not data.get(field)]
 
     return {
         "data": data,
@@ -55,16 +87,15 @@ async def validate_products_batch(data: List[dict] = Body(...)):
     Validate multiple products from batch JSON upload.
     Returns validation results for all products.
     """
-    required_fields = ["name", "campaign_id"]
     valid_products = []
     invalid_products = []
 
     for index, product_data in enumerate(data):
-        missing_fields = [field for field in required_fields if not product_data.get(field)]
-
-        if len(missing_fields) == 0:
+        # Fast path: most uploaded rows are complete
+        if all(product_data.get(field) for field in REQUIRED_PRODUCT_FIELDS):
             valid_products.append(product_data)
         else:
+            missing_fields = [field for field in REQUIRED_PRODUCT_FIELDS if not product_data.get(field)]
             invalid_products.append({
                 "index": index,
                 "data": product_data,
@@ -84,43 +115,46 @@ async def create_products_batch(batch_data: ProductBatchCreate, db: Session = De
     Create multiple products in a single transaction.
     All products must be valid or the entire batch fails (transaction rollback).
     """
-    created_products = []
-
     try:
+        # Verify all referenced campaigns exist with a single query
+        campaign_ids = {product.campaign_id for product in batch_data.products}
+        existing_campaign_ids = {
+            row[0] for row in db.query(Campaign.id).filter(Campaign.id.in_(campaign_ids)).all()
+        }
+
         for product in batch_data.products:
-            # Verify campaign exists
-            campaign = db.query(Campaign).filter(Campaign.id == product.campaign_id).first()
-            if not campaign:
+            if product.campaign_id not in existing_campaign_ids:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Campaign with id {product.campaign_id} not found"
                 )
 
-            # Process image path - download if URL
-            image_path = product.image_path
-            if image_path:
-                image_path = await process_image_path(image_path)
-
-            # Create new product
-            db_product = Product(
-                id=str(uuid.uuid4()),
-                campaign_id=product.campaign_id,
-                name=product.name,
-                description=product.description,
-                image_path=image_path
-            )
-
-            db.add(db_product)
-            created_products.append(db_product)
+        # Process image paths concurrently - download if URL
+        image_paths = await process_image_paths(
+            [product.image_path for product in batch_data.products],
+            max_concurrency=IMAGE_DOWNLOAD_CONCURRENCY
+        )
 
-        # Commit all products in single transaction
+        rows = [
+            {
+                "id": uuid.uuid4().hex,
+                "campaign_id": product.campaign_id,
+                "name": product.name,
+                "description": product.description,
+                "image_path": image_path
+            }
+            for product, image_path in zip(batch_data.products, image_paths)
+        ]
+
+        # Bulk insert bypasses per-object ORM bookkeeping; commit all rows in single transaction
+        if rows:
+            db.execute(insert(Product), rows)
         db.commit()
+        for campaign_id in campaign_ids:
+            invalidate_available_images(campaign_id)
 
-        # Refresh all products to get generated fields
-        for product in created_products:
-            db.refresh(product)
-
-        return created_products
+        # Every field is already known, so build the response without reloading rows
+        return [ProductRead(**row) for row in rows]
 
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -141,7 +175,7 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     Create a new product.
     """
     # Verify campaign exists
-    campaign = db.query(Campaign).filter(Campaign.id == product.campaign_id).first()
+    campaign = db.get(Campaign, product.campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -155,7 +189,7 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
 
     # Create new product
     db_product = Product(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4().hex,
         campaign_id=product.campaign_id,
         name=product.name,
         description=product.description,
@@ -165,25 +199,33 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
+    invalidate_available_images(db_product.campaign_id)
 
     return db_product
 
 
 @router.get("/campaigns/{campaign_id}/products", response_model=List[ProductRead])
-async def get_products_by_campaign(campaign_id: str, db: Session = Depends(get_db)):
+async def get_products_by_campaign(
+    campaign_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
     """
     Get all products for a specific campaign.
+    Pass limit/offset to page through large result sets.
     """
     # Verify campaign exists
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Campaign with id {campaign_id} not found"
         )
 
-    products = db.query(Product).filter(Product.campaign_id == campaign_id).all()
-    return products
+    query = db.query(Product).filter(Product.campaign_id == campaign_id)
+    products = _paginate(query, limit, offset).all()
+    return ORJSONResponse([dump_from_orm(ProductRead, p) for p in products])
 
 
 @router.get("/products/{product_id}", response_model=ProductRead)
@@ -191,14 +233,14 @@ async def get_product(product_id: str, db: Session = Depends(get_db)):
     """
     Get a specific product by ID.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
 
-    return product
+    return ORJSONResponse(dump_from_orm(ProductRead, product))
 
 
 @router.put("/products/{product_id}", response_model=ProductRead)
@@ -210,25 +252,28 @@ async def update_product(
     """
     Update an existing product.
     """
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    # Update only the fields the client actually sent
+    update_data = {field: getattr(product_update, field) for field in product_update.model_fields_set}
+
+    # Process image path if provided - download if URL
+    if update_data.get("image_path"):
+        # Confirm the product exists before downloading anything for it
+        if db.query(Product.id).filter(Product.id == product_id).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product with id {product_id} not found"
+            )
+        update_data["image_path"] = await process_image_path(update_data["image_path"])
+
+    db_product = update_by_pk(db, Product, product_id, update_data)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
 
-    # Update only provided fields
-    update_data = product_update.model_dump(exclude_unset=True)
-
-    # Process image path if provided - download if URL
-    if "image_path" in update_data and update_data["image_path"]:
-        update_data["image_path"] = await process_image_path(update_data["image_path"])
-
-    for field, value in update_data.items():
-        setattr(db_product, field, value)
-
     db.commit()
-    db.refresh(db_product)
+    invalidate_available_images(db_product.campaign_id)
 
     return db_product
 
@@ -238,15 +283,17 @@ async def delete_product(product_id: str, db: Session = Depends(get_db)):
     """
     Delete a product.
     """
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = db.get(Product, product_id)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
 
+    campaign_id = db_product.campaign_id
     db.delete(db_product)
     db.commit()
+    invalidate_available_images(campaign_id)
 
     return None
 
@@ -263,7 +310,7 @@ async def regenerate_product_image(
     name and description.
     """
     # Fetch the product
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = db.get(Product, product_id)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -271,40 +318,43 @@ async def regenerate_product_image(
         )
 
     try:
-        print(f"Regenerating image for product: {db_product.name}")
+        logger.info(f"🔄 Regenerating image for product: {db_product.name}")
 
-        # Initialize Gemini service
-        gemini_service = GeminiService()
+        # Shared Gemini service instance
+        gemini_service = get_gemini_service()
 
-        # Generate image from text using product information
-        generated_image = await gemini_service.generate_product_image_from_text(
+        # Generate image from text using product information (keep Gemini's encoded bytes)
+        generated_bytes = await gemini_service.generate_product_image_from_text(
             product_name=db_product.name,
             product_description=db_product.description,
-            user_prompt=request.user_prompt
+            user_prompt=request.user_prompt,
+            return_bytes=True
         )
 
-        print("✅ Image generated successfully")
+        logger.info("✅ Image generated successfully")
 
-        # Save the generated image
+        # Save the generated image (PNG bytes are written without re-encoding)
         new_image_path = await save_generated_product_image(
-            image=generated_image,
-            product_name=db_product.name
+            image=None,
+            product_name=db_product.name,
+            raw_png_bytes=generated_bytes
         )
 
-        print(f"Image saved to: {new_image_path}")
+        logger.info(f"💾 Image saved to: {new_image_path}")
 
         # Update product with new image path
         db_product.image_path = new_image_path
         db.commit()
         db.refresh(db_product)
+        invalidate_available_images(db_product.campaign_id)
 
-        print("✅ Product updated with new image path")
+        logger.info("✅ Product updated with new image path")
 
         return db_product
 
     except Exception as _:
         db.rollback()
-        print(f"Image regeneration failed: {str(_)}")
+        logger.error(f"❌ Image regeneration failed: {str(_)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to regenerate product image: {str(_)}"
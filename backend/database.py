@@ -3,21 +3,46 @@ Database configuration and session management for SQLite.
 """
 import json
 import uuid
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, event, update
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
+logger = logging.getLogger(__name__)
+
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
 
 # Create SQLAlchemy engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    pool_size=20,
+    max_overflow=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_use_lifo=True  # Reuse the most recently returned (warm) connection; idle extras age out
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragma(dbapi_conn, _connection_record):
+    """
+    Tune each new SQLite connection: WAL lets readers proceed while a write is in
+    progress, and the cache/mmap settings keep hot pages in memory.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB
+    cursor.close()
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: all columns are set in Python, so committed objects can be
+# serialized without reloading every row
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Create Base class for declarative models
 Base = declarative_base()
@@ -27,6 +52,11 @@ def get_db() -> Session:
     """
     Dependency function that yields a database session.
     Used in FastAPI endpoints to manage database connections.
+
+    Sessions are deliberately per-request rather than a thread-local scoped_session:
+    async endpoints all run on the event loop thread and the dependency runs on pooled
+    worker threads, so a thread-scoped session would be shared by concurrent requests.
+    Construction is cheap; the pooled connection underneath is what gets reused.
     """
     db = SessionLocal()
     try:
@@ -35,6 +65,20 @@ def get_db() -> Session:
         db.close()
 
 
+def update_by_pk(db: Session, model, pk: str, values: dict):
+    """
+    Apply a partial update to one row and return the updated ORM object (or None if missing).
+
+    Issues a single UPDATE ... RETURNING instead of SELECT-then-UPDATE. With an
+    empty patch there is nothing to write, so the row is just looked up.
+    """
+    if not values:
+        return db.get(model, pk)
+
+    stmt = update(model).where(model.id == pk).values(**values).returning(model)
+    return db.execute(stmt).scalar_one_or_none()
+
+
 def seed_initial_data():
     """
     Populate the database with initial sample data if campaigns table is empty.
@@ -44,13 +88,13 @@ def seed_initial_data():
 
     db = SessionLocal()
     try:
-        # Check if campaigns table is empty
-        existing_campaigns = db.query(Campaign).count()
+        # Check if campaigns table is empty (stops at the first row instead of counting)
+        has_campaigns = db.query(Campaign.id).limit(1).first() is not None
 
-        if existing_campaigns == 0:
+        if not has_campaigns:
             # Create sample campaign
             sample_campaign = Campaign(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4().hex,
                 name="Eco-Friendly Product Launch 2025",
                 campaign_message="Launch our new eco-friendly product line with stunning visuals",
                 call_to_action="Shop Now and Save the Planet!",
@@ -66,12 +110,12 @@ def seed_initial_data():
 
             db.add(sample_campaign)
             db.commit()
-            print("✅ Seeded initial campaign data")
+            logger.info("✅ Seeded initial campaign data")
         else:
-            print(f"ℹ️  Database already contains {existing_campaigns} campaign(s)")
+            logger.info("ℹ️  Database already contains campaign data")
 
     except Exception as e:
-        print(f"❌ Error seeding data: {e}")
+        logger.error(f"❌ Error seeding data: {e}")
         db.rollback()
     finally:
         db.close()
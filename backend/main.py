@@ -4,9 +4,14 @@ FastAPI main application entry point.
 Configures CORS, static file serving, database initialization, and API routing.
 """
 import os
+import queue
+import asyncio
+import logging
+import logging.handlers
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from database import Base, engine, seed_initial_data
 from api.campaigns import router as campaigns_router
@@ -15,16 +20,29 @@ from api.media import router as media_router
 from api.posts import router as posts_router
 from api.moods import router as moods_router
 from api.deploy import router as deploy_router
+from services.ayrshare_service import close_http_client as close_ayrshare_client, get_request_metrics
+from services.file_manager import close_http_client as close_download_client
+from services.gemini_service import close_gemini_client
+from services.image_compositor import shutdown_variant_pool
+from services.ayrshare_delete_queue import start_delete_worker, stop_delete_worker
 
 # Import ORM models to ensure they're registered with SQLAlchemy
 from models.orm import Campaign, Product, Post, MoodMedia, ScheduledPost
 
+# Configure logging once for the whole application.
+# Handlers only enqueue records; a background listener thread does the actual
+# stream writes so request handlers never contend on the stdout lock.
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)])
+logger = logging.getLogger(__name__)
 
 # Create FastAPI application
 app = FastAPI(
     title="Creative Automation Hub API",
     description="Backend API for the FDE Creative Automation Pipeline PoC",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson serializes list responses much faster than stdlib json
 )
 
 # Configure CORS
@@ -50,33 +68,52 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 FILES_DIR = BASE_DIR / "files"
 if FILES_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(FILES_DIR)), name="static")
-    print(f"✅ Static files mounted from: {FILES_DIR}")
+    logger.info(f"✅ Static files mounted from: {FILES_DIR}")
 else:
-    print(f"⚠️  Warning: Static files directory not found at {FILES_DIR}")
+    logger.warning(f"⚠️  Static files directory not found at {FILES_DIR}")
 
 # Mount examples directory for JSON campaign previews
 EXAMPLES_DIR = BASE_DIR / "examples"
 if EXAMPLES_DIR.exists():
     app.mount("/examples", StaticFiles(directory=str(EXAMPLES_DIR)), name="examples")
-    print(f"✅ Examples directory mounted from: {EXAMPLES_DIR}")
+    logger.info(f"✅ Examples directory mounted from: {EXAMPLES_DIR}")
 else:
-    print(f"⚠️  Warning: Examples directory not found at {EXAMPLES_DIR}")
+    logger.warning(f"⚠️  Examples directory not found at {EXAMPLES_DIR}")
 
 
 @app.on_event("startup")
 async def startup_event():
     """
     Run on application startup.
-    Creates database tables and seeds initial data if needed.
+    Starts the log listener, creates database tables, seeds initial data if needed
+    and starts the Ayrshare delete worker.
     """
-    print("🚀 Starting Creative Automation Hub API...")
+    _log_listener.start()
+    logger.info("🚀 Starting Creative Automation Hub API...")
 
-    # Create all database tables
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created/verified")
+    # Create all database tables (blocking DB work runs off the event loop)
+    await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+    logger.info("✅ Database tables created/verified")
 
     # Seed initial data
-    seed_initial_data()
+    await asyncio.to_thread(seed_initial_data)
+
+    # Send Ayrshare deletes in the background (replays any left from the last run)
+    await start_delete_worker()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Run on application shutdown.
+    Stops the Ayrshare delete worker, closes shared HTTP clients, stops the image variant workers and flushes any queued log records.
+    """
+    await stop_delete_worker()
+    await close_ayrshare_client()
+    await close_download_client()
+    await close_gemini_client()
+    await shutdown_variant_pool()
+    _log_listener.stop()
 
 
 @app.get("/")
@@ -89,3 +126,21 @@ async def root():
         "status": "healthy",
         "docs": "/docs"
     }
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Database connection pool and outbound Ayrshare concurrency metrics.
+    """
+    pool = engine.pool
+    return {
+        "pool": {
+            "status": pool.status(),
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow()
+        },
+        "ayrshare": get_request_metrics()
+    }
@@ -0,0 +1,53 @@
+"""
+Database migration script for composite list-query indexes.
+
+Adds:
+    ix_products_campaign_id_id        ON products (campaign_id, id)
+    ix_posts_campaign_id_created_at   ON posts (campaign_id, created_at)
+    ix_moods_media_campaign_id_created_at   ON moods_media (campaign_id, created_at)
+    ix_moods_media_campaign_id_media_type   ON moods_media (campaign_id, media_type)
+
+New databases get these from Base.metadata.create_all on startup; this script
+adds them to an existing app.db. Safe to run more than once.
+"""
+import sqlite3
+import os
+
+# Path to database
+DB_PATH = os.path.join(os.path.dirname(__file__), "app.db")
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_products_campaign_id_id ON products (campaign_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_campaign_id_created_at ON posts (campaign_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_moods_media_campaign_id_created_at ON moods_media (campaign_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_moods_media_campaign_id_media_type ON moods_media (campaign_id, media_type)",
+]
+
+
+def run_migration():
+    """Create any missing composite indexes."""
+    print("🔄 Adding composite indexes...")
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        for statement in INDEXES:
+            cursor.execute(statement)
+
+        # Refresh planner statistics so the new indexes are picked up
+        cursor.execute("ANALYZE")
+        conn.commit()
+        print("✅ Indexes created successfully!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
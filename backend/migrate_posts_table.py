@@ -14,6 +14,9 @@ import os
 # Path to database
 DB_PATH = os.path.join(os.path.dirname(__file__), "app.db")
 
+# Rows fetched per round-trip when backfilling
+BACKFILL_BATCH_SIZE = 1000
+
 
 def run_migration():
     """Execute the database migration."""
@@ -52,27 +55,38 @@ def run_migration():
         # Step 5: Backfill source_images from existing product.image_path
         print("  Backfilling source_images from product data...")
 
-        # Get all posts with their product image paths
-        cursor.execute("""
-            SELECT posts.id, products.image_path
-            FROM posts
-            LEFT JOIN products ON posts.product_id = products.id
-            WHERE posts.source_images IS NULL
-        """)
-
-        posts_to_update = cursor.fetchall()
-        print(f"  Found {len(posts_to_update)} posts to backfill")
-
-        for post_id, product_image_path in posts_to_update:
-            if product_image_path:
-                # Store as JSON array with single image path
-                source_images_json = json.dumps([product_image_path])
-                cursor.execute(
-                    "UPDATE posts SET source_images = ? WHERE id = ?",
-                    (source_images_json, post_id)
+        # Read posts with their product image paths in id-ordered chunks instead of loading
+        # all rows. Each chunk is fully fetched by a fresh SELECT before it is updated, so no
+        # scan over posts is left open while posts is being written.
+        posts_backfilled = 0
+        last_id = ""
+        while True:
+            cursor.execute("""
+                SELECT posts.id, products.image_path
+                FROM posts
+                LEFT JOIN products ON posts.product_id = products.id
+                WHERE posts.source_images IS NULL AND posts.id > ?
+                ORDER BY posts.id
+                LIMIT ?
+            """, (last_id, BACKFILL_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            # Store as JSON array with single image path; one prepared statement per chunk
+            cursor.executemany(
+                "UPDATE posts SET source_images = ? WHERE id = ?",
+                (
+                    (json.dumps([product_image_path]), post_id)
+                    for post_id, product_image_path in rows
+                    if product_image_path
                 )
+            )
+            # Posts without a product image are skipped, so count actual updates
+            posts_backfilled += cursor.rowcount
 
-        print(f"  ✅ Backfilled {len(posts_to_update)} posts with source_images")
+        print(f"  ✅ Backfilled {posts_backfilled} posts with source_images")
 
         # Commit all changes
         conn.commit()
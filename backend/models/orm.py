@@ -1,7 +1,7 @@
 """
 SQLAlchemy ORM models for the Creative Automation Hub.
 """
-from sqlalchemy import Column, String, Text, ForeignKey, Date, Integer, DateTime, Boolean
+from sqlalchemy import Column, String, Text, ForeignKey, Date, Integer, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -38,9 +38,13 @@ class Product(Base):
     Links to a campaign via foreign key and stores product details and image.
     """
     __tablename__ = "products"
+    __table_args__ = (
+        # Lets per-campaign product listings be served from the index
+        Index("ix_products_campaign_id_id", "campaign_id", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
-    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False, index=True)
+    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False)  # Covered by ix_products_campaign_id_id
     name = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
     image_path = Column(Text, nullable=True)  # Relative path to file in /files/media/
@@ -59,9 +63,13 @@ class Post(Base):
     generated images for multiple aspect ratios.
     """
     __tablename__ = "posts"
+    __table_args__ = (
+        # Matches get_posts: filter by campaign, newest first
+        Index("ix_posts_campaign_id_created_at", "campaign_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, index=True)
-    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False, index=True)
+    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False)  # Covered by ix_posts_campaign_id_created_at
     product_id = Column(String, ForeignKey("products.id"), nullable=True, index=True)  # Now nullable
     mood_id = Column(String, ForeignKey("moods_media.id"), nullable=True, index=True)  # New field
     source_images = Column(Text, nullable=True)  # JSON array of image paths used for generation
@@ -89,9 +97,15 @@ class MoodMedia(Base):
     including prompts, source images, and aspect ratios.
     """
     __tablename__ = "moods_media"
+    __table_args__ = (
+        # Mood board listing: filter by campaign, newest first
+        Index("ix_moods_media_campaign_id_created_at", "campaign_id", "created_at"),
+        # Available-images lookups: filter by campaign and media_type == "image"
+        Index("ix_moods_media_campaign_id_media_type", "campaign_id", "media_type"),
+    )
 
     id = Column(String, primary_key=True, index=True)
-    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False, index=True)
+    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False)  # Covered by composite indexes
     file_path = Column(Text, nullable=False)  # Relative path (e.g., moods/Summer2025_img_20250111_143022_1-1.png)
     gcs_uri = Column(Text, nullable=True)  # GCS URI (e.g., gs://bucket/moods/file.png) - for Veo reference images
     media_type = Column(String, nullable=False)  # "image" or "video"
@@ -130,3 +144,17 @@ class ScheduledPost(Base):
     # Relationships
     post = relationship("Post")
     campaign = relationship("Campaign")
+
+
+class PendingAyrshareDelete(Base):
+    """
+    Ayrshare post deletion waiting to be sent.
+
+    Written in the same transaction that removes the local ScheduledPost, and
+    removed once Ayrshare confirms the delete, so queued deletes survive restarts.
+    """
+    __tablename__ = "pending_ayrshare_deletes"
+
+    ayrshare_post_id = Column(String, primary_key=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
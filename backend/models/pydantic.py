@@ -1,11 +1,40 @@
 """
 Pydantic schemas for API request/response validation.
 """
+from functools import lru_cache
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import date, datetime
 
 
+def read_from_orm(schema, obj):
+    """
+    Build a *Read schema from a trusted ORM row without running validation.
+
+    Rows coming out of the database are already type-correct, so model_construct
+    skips the validator tree. Only use this for response data, never client input.
+    """
+    return schema.model_construct(**{field: getattr(obj, field) for field in schema.model_fields})
+
+
+@lru_cache(maxsize=None)
+def _field_names(schema) -> tuple:
+    """Field names of a schema, computed once per class."""
+    return tuple(schema.model_fields)
+
+
+def dump_from_orm(schema, obj) -> dict:
+    """
+    Plain dict of a *Read schema's fields taken straight from a trusted ORM row.
+
+    Skips pydantic entirely (no construct, no serializer); the result is meant to be
+    encoded directly by ORJSONResponse, which handles dates and datetimes natively.
+    Endpoints return that Response themselves, so FastAPI doesn't re-validate the
+    rows against response_model; ORM rows already satisfy the schema.
+    """
+    return {field: getattr(obj, field) for field in _field_names(schema)}
+
+
 class CampaignCreate(BaseModel):
     """
     Schema for creating a new campaign.
@@ -85,6 +114,10 @@ class ProductCreateNested(BaseModel):
     image_path: Optional[str] = None
 
 
+# Resolve the "ProductCreateNested" forward reference once at import
+CampaignWithProductsCreate.model_rebuild()
+
+
 class ProductCreate(BaseModel):
     """
     Schema for creating a new product.
@@ -216,6 +249,7 @@ class PostGenerateRequest(BaseModel):
     source_images: List[str]  # Array of image paths (products or mood board images)
     prompt: str
     aspect_ratios: List[str] = ["1:1"]  # Default to 1:1, can include "16:9", "9:16"
+    use_local_reframe: bool = True  # Reframe extra ratios locally instead of a Gemini adaptation call
 
 
 class PostRegenerateRequest(BaseModel):
@@ -226,6 +260,7 @@ class PostRegenerateRequest(BaseModel):
     product_id: str
     prompt: str
     aspect_ratios: List[str] = ["1:1"]  # Aspect ratios to regenerate
+    use_local_reframe: bool = True  # Reframe extra ratios locally instead of a Gemini adaptation call
 
 
 class MoodMediaCreate(BaseModel):
@@ -285,13 +320,31 @@ class MoodVideoGenerateRequest(BaseModel):
     duration: int = 6  # 4, 6, or 8 seconds
 
 
+class AvailableProductImage(BaseModel):
+    """
+    Narrow product projection for the source-image picker.
+    """
+    id: str
+    name: str
+    image_path: Optional[str] = None
+
+
+class AvailableMoodImage(BaseModel):
+    """
+    Narrow mood image projection for the source-image picker.
+    """
+    id: str
+    file_path: str
+    aspect_ratio: Optional[str] = None
+
+
 class MoodAvailableImagesResponse(BaseModel):
     """
     Schema for returning available images for mood generation.
-    Includes products and existing mood images.
+    Includes products and existing mood images (only the fields the picker uses).
     """
-    products: List[ProductRead]
-    mood_images: List[MoodMediaRead]
+    products: List[AvailableProductImage]
+    mood_images: List[AvailableMoodImage]
 
 
 class AyrshareProfile(BaseModel):
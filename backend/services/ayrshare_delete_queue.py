@@ -0,0 +1,136 @@
+"""
+Background queue for Ayrshare post deletions.
+
+Canceling a scheduled post only needs the local delete to succeed; the Ayrshare
+DELETE call is sent afterwards by a single worker task. Each pending delete is
+persisted as a PendingAyrshareDelete row (committed with the local delete), so
+anything still queued at shutdown or crash is replayed on the next startup.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+import httpx
+
+from database import SessionLocal
+from models.orm import PendingAyrshareDelete
+from .ayrshare_service import get_ayrshare_service
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Failed deletes are retried after a delay, up to a fixed number of attempts
+RETRY_DELAY_SECONDS = 60.0
+MAX_DELETE_ATTEMPTS = 10
+
+_queue: Optional[asyncio.Queue] = None
+_worker_task: Optional[asyncio.Task] = None
+
+
+def enqueue_delete(ayrshare_post_id: str) -> None:
+    """
+    Hand a committed PendingAyrshareDelete to the worker.
+    If the worker isn't running, the row is picked up on the next startup.
+    """
+    if _queue is not None:
+        _queue.put_nowait(ayrshare_post_id)
+
+
+def _load_pending() -> List[str]:
+    with SessionLocal() as db:
+        return [row.ayrshare_post_id for row in db.query(PendingAyrshareDelete.ayrshare_post_id)]
+
+
+def _remove_pending(ayrshare_post_id: str) -> None:
+    with SessionLocal() as db:
+        db.query(PendingAyrshareDelete)\
+            .filter(PendingAyrshareDelete.ayrshare_post_id == ayrshare_post_id)\
+            .delete(synchronize_session=False)
+        db.commit()
+
+
+def _record_attempt(ayrshare_post_id: str) -> int:
+    with SessionLocal() as db:
+        pending = db.get(PendingAyrshareDelete, ayrshare_post_id)
+        if pending is None:
+            return 0
+        pending.attempts += 1
+        db.commit()
+        return pending.attempts
+
+
+def _is_permanent_failure(error: Exception) -> bool:
+    """
+    4xx responses other than 429 won't succeed on retry (e.g. the post is already gone).
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return 400 <= code < 500 and code != 429
+    return False
+
+
+async def _deleter_loop() -> None:
+    loop = asyncio.get_running_loop()
+
+    while True:
+        ayrshare_post_id = await _queue.get()
+        try:
+            await get_ayrshare_service().delete_post(ayrshare_post_id)
+            await asyncio.to_thread(_remove_pending, ayrshare_post_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if _is_permanent_failure(e):
+                logger.warning(f"⚠️ Ayrshare rejected delete of {ayrshare_post_id}, dropping: {str(e)}")
+                await asyncio.to_thread(_remove_pending, ayrshare_post_id)
+                continue
+
+            attempts = await asyncio.to_thread(_record_attempt, ayrshare_post_id)
+            if attempts >= MAX_DELETE_ATTEMPTS:
+                logger.error(f"❌ Giving up on Ayrshare delete of {ayrshare_post_id} after {attempts} attempts: {str(e)}")
+                await asyncio.to_thread(_remove_pending, ayrshare_post_id)
+            else:
+                logger.warning(f"⚠️ Ayrshare delete of {ayrshare_post_id} failed (attempt {attempts}), retrying: {str(e)}")
+                loop.call_later(RETRY_DELAY_SECONDS, enqueue_delete, ayrshare_post_id)
+        finally:
+            _queue.task_done()
+
+
+async def start_delete_worker() -> None:
+    """
+    Start the worker and replay deletes left over from a previous run.
+    Called on application startup, after tables are created.
+    Skipped when Ayrshare isn't configured; pending rows wait for a run that is.
+    """
+    global _queue, _worker_task
+    if not get_settings().AYRSHARE_API_KEY:
+        logger.warning("⚠️ AYRSHARE_API_KEY not set, Ayrshare delete worker not started")
+        return
+
+    _queue = asyncio.Queue()
+
+    pending = await asyncio.to_thread(_load_pending)
+    for ayrshare_post_id in pending:
+        _queue.put_nowait(ayrshare_post_id)
+    if pending:
+        logger.info(f"🔁 Replaying {len(pending)} pending Ayrshare deletes")
+
+    _worker_task = asyncio.create_task(_deleter_loop())
+
+
+async def stop_delete_worker() -> None:
+    """
+    Stop the worker. Unsent deletes stay in the database for the next startup.
+    Called on application shutdown.
+    """
+    global _queue, _worker_task
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Ayrshare delete worker had stopped with an error: {str(e)}")
+    _worker_task = None
+    _queue = None
@@ -8,15 +8,164 @@ Handles interaction with Ayrshare API for:
 - Creating recurring posts with Auto Repost
 - Canceling scheduled posts
 """
+import asyncio
+import random
+import time
 import logging
 import httpx
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+import orjson
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from .config import get_settings
+from .cache import AYRSHARE_PROFILES_CACHE, AYRSHARE_POST_STATUS_CACHE
 
 logger = logging.getLogger(__name__)
 
+# Retry policy for transient Ayrshare failures (exponential backoff with full jitter)
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 8.0
+# Rejected before processing: always safe to retry
+RETRY_ALWAYS_STATUSES = {429, 503}
+# May have been processed: only retried for idempotent methods
+RETRY_IDEMPOTENT_STATUSES = {500, 502, 504}
+IDEMPOTENT_METHODS = {"GET", "DELETE"}
+
+# Bulkhead: cap concurrent in-flight Ayrshare requests per process
+MAX_CONCURRENT_REQUESTS = 16
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+_in_flight = 0
+
+
+
+class AyrshareUnavailableError(Exception):
+    """
+    Raised without contacting Ayrshare while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Minimal CLOSED/OPEN/HALF_OPEN circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls fail
+    fast. Once recovery_timeout has passed, a single probe call is let through:
+    success closes the circuit, failure re-opens it for another timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise AyrshareUnavailableError if the call should be short-circuited."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self.probe_in_flight):
+            raise AyrshareUnavailableError("Ayrshare is temporarily unavailable; try again shortly")
+        if state == "half_open":
+            self.probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.error(f"🔌 Ayrshare circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+_breaker = CircuitBreaker()
+
+# Shared pooled client: keeps TCP/TLS sessions to Ayrshare alive across requests.
+# HTTP/2 multiplexes concurrent requests over one connection, so the pool stays small.
+_http_client: Optional[httpx.AsyncClient] = None
+_negotiated_http_version: Optional[str] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared Ayrshare HTTP client, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_keepalive_connections=2, max_connections=4, keepalive_expiry=60)
+        )
+    return _http_client
+
+
+def get_request_metrics() -> Dict[str, Any]:
+    """
+    Current Ayrshare bulkhead usage and connection protocol, for the /metrics endpoint.
+    """
+    return {
+        "in_flight": _in_flight,
+        "max_concurrent": MAX_CONCURRENT_REQUESTS,
+        "circuit": _breaker.state,
+        "http_version": _negotiated_http_version
+    }
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared Ayrshare HTTP client. Called on application shutdown.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _iso_z(dt: datetime) -> str:
+    """
+    Format a datetime as ISO-8601 UTC with a trailing Z (naive values are treated as UTC).
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _build_post_payload(
+    post_text: str,
+    platforms: List[str],
+    schedule_time: datetime,
+    media_urls: Optional[List[str]] = None,
+    auto_repost: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Build the /post request body shared by immediate, scheduled, and recurring posts.
+    """
+    payload = {
+        "post": post_text,
+        "platforms": platforms,
+        "scheduleDate": _iso_z(schedule_time)
+    }
+    if auto_repost:
+        payload["autoRepost"] = auto_repost
+    if media_urls:
+        payload["mediaUrls"] = media_urls
+    return payload
+
 
 class AyrshareService:
     """
@@ -30,53 +179,129 @@ class AyrshareService:
         if not settings.AYRSHARE_API_KEY:
             raise ValueError("AYRSHARE_API_KEY not found in environment variables")
 
-        # Strip whitespace and quotes that might be in .env file
-        self.api_key = settings.AYRSHARE_API_KEY.strip().strip('"').strip("'")
+        # Whitespace/quotes from the .env file are already stripped by Settings
         self.base_url = settings.AYRSHARE_BASE_URL
 
-        # Ayrshare uses Bearer authentication
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        # Ayrshare uses Bearer authentication; the header mapping is shared and read-only
+        self.headers = settings.AYRSHARE_HEADERS
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to Ayrshare, retrying transient failures.
+
+        429/503 and connect failures are retried for every method. Other 5xx
+        responses and read timeouts are retried only for GET/DELETE, so a post
+        that may already have been accepted is never submitted twice. 4xx
+        auth/validation errors are returned immediately. Honors Retry-After.
+
+        The whole call (including retries) counts as one success/failure for the
+        circuit breaker; while it is open this raises AyrshareUnavailableError at once.
+        """
+        _breaker.before_call()
+        try:
+            response = await self._request_with_retries(method, path, **kwargs)
+        except httpx.TransportError:
+            _breaker.record_failure()
+            raise
+        except BaseException:
+            _breaker.probe_in_flight = False
+            raise
+
+        if response.status_code >= 500:
+            _breaker.record_failure()
+        else:
+            _breaker.record_success()
+        return response
+
+    async def _request_with_retries(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Retry loop behind _request (see its docstring for the policy).
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            retry_after = None
+            try:
+                response = await self._send(method, path, **kwargs)
+                retryable = response.status_code in RETRY_ALWAYS_STATUSES or (
+                    idempotent and response.status_code in RETRY_IDEMPOTENT_STATUSES
+                )
+                if not retryable or attempt == MAX_ATTEMPTS:
+                    return response
+                retry_after = response.headers.get("retry-after")
+                reason = f"HTTP {response.status_code}"
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                reason = type(e).__name__
+            except httpx.TransportError as e:
+                if not idempotent or attempt == MAX_ATTEMPTS:
+                    raise
+                reason = type(e).__name__
+
+            if retry_after and retry_after.isdigit():
+                delay = min(float(retry_after), BACKOFF_MAX_SECONDS)
+            else:
+                delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            logger.warning(f"  ⚠️ Ayrshare {method} {path} failed ({reason}), retry {attempt}/{MAX_ATTEMPTS - 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send one request through the bulkhead (waits for a free slot; backoff sleeps don't hold one).
+        """
+        global _in_flight, _negotiated_http_version
+        async with _request_semaphore:
+            _in_flight += 1
+            try:
+                # Fetched per request so a client closed at shutdown is recreated on reuse
+                response = await _get_http_client().request(
+                    method, f"{self.base_url}{path}", headers=self.headers, **kwargs
+                )
+                if response.http_version != _negotiated_http_version:
+                    _negotiated_http_version = response.http_version
+                    logger.info(f"🔌 Ayrshare connection using {_negotiated_http_version}")
+                return response
+            finally:
+                _in_flight -= 1
 
     async def get_profiles(self) -> List[Dict[str, Any]]:
         """
         Get all connected social media profiles from Ayrshare.
+        Results are cached briefly (see AYRSHARE_PROFILES_CACHE).
         """
+        cached = AYRSHARE_PROFILES_CACHE.get("profiles")
+        if cached is not None:
+            return cached
+
         logger.info("📱 Fetching connected profiles from Ayrshare...")
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/user",
-                    headers=self.headers,
-                    timeout=30.0
+        try:
+            response = await self._request("GET", "/user", timeout=30.0)
+
+            # Log response details for debugging
+            logger.info(f"  Response Status: {response.status_code}")
+
+            if response.status_code == 403:
+                # Log the error response body
+                error_body = response.text
+                logger.error(f"  403 Error Response: {error_body}")
+                raise httpx.HTTPStatusError(
+                    f"Authentication failed. Check your API key. Response: {error_body}",
+                    request=response.request,
+                    response=response
                 )
 
-                # Log response details for debugging
-                logger.info(f"  Response Status: {response.status_code}")
-
-                if response.status_code == 403:
-                    # Log the error response body
-                    error_body = response.text
-                    logger.error(f"  403 Error Response: {error_body}")
-                    raise httpx.HTTPStatusError(
-                        f"Authentication failed. Check your API key. Response: {error_body}",
-                        request=response.request,
-                        response=response
-                    )
-
-                response.raise_for_status()
-                data = response.json()
-                logger.info("API call successful")
-
-            except httpx.HTTPStatusError as _:
-                logger.error(f"HTTP Error: {_}")
-                raise
-            except Exception as _:
-                logger.error(f"Unexpected error: {_}")
-                raise
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            logger.info("API call successful")
+
+        except httpx.HTTPStatusError as _:
+            logger.error(f"HTTP Error: {_}")
+            raise
+        except Exception as _:
+            logger.error(f"Unexpected error: {_}")
+            raise
 
         # Ayrshare returns profiles in data.displayNames (list of profile objects)
         # activeSocialAccounts is just a list of platform names ['twitter', 'facebook', etc]
@@ -95,6 +320,7 @@ class AyrshareService:
             })
 
         logger.info(f"  ✓ Transformed {len(transformed_profiles)} profiles")
+        AYRSHARE_PROFILES_CACHE["profiles"] = transformed_profiles
         return transformed_profiles
 
     async def post_immediate(
@@ -109,26 +335,16 @@ class AyrshareService:
         logger.info(f"📤 Posting immediately to {platforms}...")
 
         # Schedule 10 seconds from now to ensure processing time
-        schedule_time = datetime.utcnow() + timedelta(seconds=10)
-
-        payload = {
-            "post": post_text,
-            "platforms": platforms,
-            "scheduleDate": schedule_time.isoformat() + "Z"
-        }
-
-        if media_urls:
-            payload["mediaUrls"] = media_urls
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/post",
-                headers=self.headers,
-                json=payload,
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        schedule_time = datetime.now(timezone.utc) + timedelta(seconds=10)
+        payload = _build_post_payload(post_text, platforms, schedule_time, media_urls)
+
+        response = await self._request(
+            "POST", "/post",
+            content=orjson.dumps(payload),  # Content-Type is set in self.headers
+            timeout=60.0
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
 
         logger.info("  Posted successfully")
         return data
@@ -145,24 +361,11 @@ class AyrshareService:
         """
         logger.info(f"Scheduling post for {schedule_time.isoformat()} on {platforms}.")
 
-        payload = {
-            "post": post_text,
-            "platforms": platforms,
-            "scheduleDate": schedule_time.isoformat() + "Z"  # ISO-8601 with UTC
-        }
-
-        if media_urls:
-            payload["mediaUrls"] = media_urls
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/post",
-                headers=self.headers,
-                json=payload,
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        payload = _build_post_payload(post_text, platforms, schedule_time, media_urls)
+
+        response = await self._request("POST", "/post", content=orjson.dumps(payload), timeout=60.0)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
 
         logger.info(f"  ✅ Scheduled successfully: {data.get('id', 'N/A')}")
         return data
@@ -187,28 +390,14 @@ class AyrshareService:
         if days_interval < 2:
             raise ValueError("Days interval must be 2 or more")
 
-        payload = {
-            "post": post_text,
-            "platforms": platforms,
-            "scheduleDate": start_time.isoformat() + "Z",
-            "autoRepost": {
-                "repeat": repeat,
-                "days": days_interval
-            }
-        }
-
-        if media_urls:
-            payload["mediaUrls"] = media_urls
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/post",
-                headers=self.headers,
-                json=payload,
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        payload = _build_post_payload(
+            post_text, platforms, start_time, media_urls,
+            auto_repost={"repeat": repeat, "days": days_interval}
+        )
+
+        response = await self._request("POST", "/post", content=orjson.dumps(payload), timeout=60.0)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
 
         logger.info(f"  Recurring post created: {data.get('id', 'N/A')}")
         return data
@@ -221,33 +410,40 @@ class AyrshareService:
 
         payload = {"id": ayrshare_post_id}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.base_url}/delete",
-                headers=self.headers,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await self._request("DELETE", "/delete", content=orjson.dumps(payload), timeout=30.0)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
 
+        AYRSHARE_POST_STATUS_CACHE.pop(ayrshare_post_id, None)
         logger.info("  ✅ Post deleted successfully")
         return data
 
     async def get_post_status(self, ayrshare_post_id: str) -> Dict[str, Any]:
         """
         Get status of a specific post.
+        Results are cached for a few seconds (see AYRSHARE_POST_STATUS_CACHE).
         """
+        cached = AYRSHARE_POST_STATUS_CACHE.get(ayrshare_post_id)
+        if cached is not None:
+            return cached
+
         logger.info(f"📊 Getting status for post {ayrshare_post_id}...")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/post/{ayrshare_post_id}",
-                headers=self.headers,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await self._request("GET", f"/post/{ayrshare_post_id}", timeout=30.0)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
 
         logger.info(f"  Status retrieved: {data.get('status', 'unknown')}")
+        AYRSHARE_POST_STATUS_CACHE[ayrshare_post_id] = data
         return data
+
+
+@lru_cache()
+def get_ayrshare_service() -> AyrshareService:
+    """
+    Get the shared AyrshareService instance (settings and headers built once).
+
+    Returns:
+        AyrshareService: Singleton service instance
+    """
+    return AyrshareService()
@@ -0,0 +1,29 @@
+"""
+In-process caches for frequently read, rarely changing API responses.
+"""
+from cachetools import TTLCache
+
+
+# Serialized "available images" responses (products + mood images) keyed by campaign_id
+AVAILABLE_IMAGES_CACHE = TTLCache(maxsize=512, ttl=30)
+
+# Transformed Ayrshare connected profiles; they change on the order of minutes to hours
+AYRSHARE_PROFILES_CACHE = TTLCache(maxsize=1, ttl=60)
+
+# Ayrshare post status keyed by Ayrshare post id; absorbs status-page polling
+AYRSHARE_POST_STATUS_CACHE = TTLCache(maxsize=256, ttl=15)
+
+
+def invalidate_available_images(campaign_id: str) -> None:
+    """
+    Drop the cached available-images response for a campaign.
+    Call after any write to the campaign's products or mood media.
+    """
+    AVAILABLE_IMAGES_CACHE.pop(campaign_id, None)
+
+
+def invalidate_profiles_cache() -> None:
+    """
+    Drop the cached Ayrshare profiles so the next request refetches them.
+    """
+    AYRSHARE_PROFILES_CACHE.clear()
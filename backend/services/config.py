@@ -3,9 +3,11 @@ Application configuration using Pydantic Settings.
 
 Automatically loads environment variables from .env file.
 """
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Mapping, Optional
 
 
 class Settings(BaseSettings):
@@ -30,6 +32,26 @@ class Settings(BaseSettings):
         extra="ignore"  # Ignore extra fields in .env
     )
 
+    @field_validator("AYRSHARE_API_KEY")
+    @classmethod
+    def strip_api_key_quotes(cls, value: Optional[str]) -> Optional[str]:
+        """
+        Strip whitespace and quotes that might be in .env file (done once at load).
+        """
+        if value is None:
+            return value
+        return value.strip().strip('"').strip("'")
+
+    @cached_property
+    def AYRSHARE_HEADERS(self) -> Mapping[str, str]:
+        """
+        Read-only Ayrshare request headers (Bearer auth + JSON), built once per Settings.
+        """
+        return MappingProxyType({
+            "Authorization": f"Bearer {self.AYRSHARE_API_KEY}",
+            "Content-Type": "application/json"
+        })
+
 
 @lru_cache()
 def get_settings() -> Settings:
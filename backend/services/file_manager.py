@@ -1,14 +1,25 @@
 """
 File management service for handling image uploads and URL downloads.
 """
-import uuid
+import asyncio
+import functools
+import hashlib
+import io
+import logging
+import mmap
+import os
 import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 import httpx
 from fastapi import UploadFile
+from PIL import Image
 import re
 
+logger = logging.getLogger(__name__)
+
 
 # Base directories
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -16,13 +27,237 @@ MEDIA_DIR = BASE_DIR / "files" / "media"
 POSTS_DIR = BASE_DIR / "files" / "posts"
 MOODS_DIR = BASE_DIR / "files" / "moods"
 
+# Directories already created by this process (skips repeat mkdir/stat calls)
+_DIR_CACHE: set = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    """Create a directory (and parents) the first time it's written to."""
+    if path not in _DIR_CACHE:
+        path.mkdir(parents=True, exist_ok=True)
+        _DIR_CACHE.add(path)
+
+
 # Ensure directories exist
-MEDIA_DIR.mkdir(parents=True, exist_ok=True)
-POSTS_DIR.mkdir(parents=True, exist_ok=True)
-MOODS_DIR.mkdir(parents=True, exist_ok=True)
+_ensure_dir(MEDIA_DIR)
+_ensure_dir(POSTS_DIR)
+_ensure_dir(MOODS_DIR)
+
+# Resolved storage roots (for traversal checks) and static URL prefix -> directory
+_RESOLVED_DIRS = {d: d.resolve() for d in (MEDIA_DIR, POSTS_DIR, MOODS_DIR)}
+_PREFIX_TO_DIR = {
+    "/static/media/": MEDIA_DIR,
+    "/static/posts/": POSTS_DIR,
+    "/static/moods/": MOODS_DIR,
+}
+
+# Filename sanitizing patterns for generated product images
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s-]')
+_SEPARATORS_RE = re.compile(r'[-\s]+')
 
 # Allowed image extensions
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
+ALLOWED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"})
+
+# Leading bytes of each allowed image format, used to verify uploads
+MAGIC_HEADER_SIZE = 32
+_JPEG_EXTENSIONS = {".jpg", ".jpeg"}
+
+
+class UnsupportedMediaTypeError(ValueError):
+    """Raised when an upload's contents don't match an allowed image format."""
+
+
+# Image content-type (without parameters) to file extension
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+    "image/svg": ".svg",
+}
+
+# Download limits: chunk size for streaming to disk and maximum accepted image size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024
+
+# Without copy_file_range, local copies at least this large go through mmap
+MMAP_COPY_MIN_BYTES = 4 * 1024 * 1024
+
+# Buffered download chunks are flushed to disk once they reach this size
+WRITE_BATCH_BYTES = 1 << 20
+
+# Videos at least this large are flushed and evicted from the page cache after writing
+LARGE_WRITE_BYTES = 1 << 20
+
+# Dedicated pool for blocking disk I/O, so file writes don't queue behind long
+# Gemini calls in the default executor
+_WRITE_POOL = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="file-writer"
+)
+
+# Max concurrent downloads/copies in process_image_paths
+IMAGE_PROCESS_CONCURRENCY = 16
+
+# Download coalescing: concurrent requests for one URL share a single fetch,
+# and recently downloaded URLs map straight to their saved file
+DOWNLOAD_CACHE_SIZE = 512
+_inflight_downloads: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+_downloaded_paths: "OrderedDict[str, str]" = OrderedDict()
+
+# Shared pooled client for image downloads (reuses connections across requests)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared download client, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared download client. Called on application shutdown.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def detect_image_extension(header: bytes) -> Optional[str]:
+    """
+    Detect an image format from its leading bytes.
+
+    Returns:
+        The canonical extension (".png", ".jpg", ...) or None if unrecognized
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    text_start = header.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text_start.startswith((b"<svg", b"<?xml")):
+        return ".svg"
+    return None
+
+
+def _safe_join(base: Path, name: str) -> Path:
+    """
+    Join a relative name onto a base directory, refusing paths that escape it.
+
+    Raises:
+        ValueError: If the resolved path is outside base
+    """
+    root = _RESOLVED_DIRS.get(base) or base.resolve()
+    path = (base / name).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"Path escapes {base.name}/: {name}")
+    return path
+
+
+def _write_chunks(f, chunks) -> None:
+    """
+    Write a list of chunks to an open binary file with one writev call
+    (looping on partial writes); plain writes where writev is unavailable.
+    """
+    if not chunks:
+        return
+    if not hasattr(os, "writev"):
+        for chunk in chunks:
+            f.write(chunk)
+        return
+
+    f.flush()
+    fd = f.fileno()
+    views = [memoryview(chunk) for chunk in chunks]
+    while views:
+        n = os.writev(fd, views)
+        while views and n >= len(views[0]):
+            n -= len(views[0])
+            views.pop(0)
+        if views and n:
+            views[0] = views[0][n:]
+
+
+def _copy_file(source_path: Path, dest_path: Path) -> None:
+    """
+    Copy a file in-kernel with copy_file_range (a reflink on filesystems that
+    support it), preserving metadata like shutil.copy2. Where copy_file_range
+    doesn't exist, large files are written straight from an mmap of the source;
+    everything else falls back to shutil.copy2.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+                size = os.fstat(src.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), size - offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+            if offset == size:
+                shutil.copystat(source_path, dest_path)
+                return
+        except OSError:
+            pass  # e.g. EXDEV/ENOSYS on older kernels; redo the copy below
+    elif source_path.stat().st_size >= MMAP_COPY_MIN_BYTES:
+        with open(source_path, "rb") as src:
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped, open(dest_path, "wb") as dst:
+                dst.write(mapped)
+        shutil.copystat(source_path, dest_path)
+        return
+
+    shutil.copy2(source_path, dest_path)
+
+
+def _store_content_addressed(tmp_path: Path, digest: str, prefix: str, ext: str) -> str:
+    """
+    Move a fully written temp file to its content-addressed name in MEDIA_DIR.
+    If identical bytes are already stored, the temp file is dropped and the
+    existing file is reused.
+
+    Returns:
+        The final filename
+    """
+    filename = f"{prefix}_{digest[:16]}{ext}"
+    final_path = MEDIA_DIR / filename
+    if final_path.exists():
+        tmp_path.unlink()
+    else:
+        tmp_path.replace(final_path)
+    return filename
+
+
+def _copy_upload(source, tmp_path: Path) -> str:
+    """
+    Copy an uploaded file's spooled contents to disk, hashing as it goes
+    (runs in a worker thread).
+
+    Returns:
+        SHA-256 hex digest of the contents
+    """
+    hasher = hashlib.sha256()
+    with open(tmp_path, "wb") as buffer:
+        while chunk := source.read(DOWNLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            buffer.write(chunk)
+    return hasher.hexdigest()
 
 
 def is_url(path: str) -> bool:
@@ -51,57 +286,145 @@ def is_local_file_path(path: str) -> bool:
     return "/" in path or "\\" in path or Path(path).suffix != ""
 
 
+async def run_file_io(func: Callable[..., Any], *args) -> Any:
+    """
+    Run a blocking filesystem call on the file-writer pool and await its result.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_WRITE_POOL, func, *args)
+
+
+def _random_token(nbytes: int = 16) -> str:
+    """Random hex token for unique filenames (os.urandom directly, no UUID object)."""
+    return os.urandom(nbytes).hex()
+
+
 def get_file_extension(filename: str) -> str:
-    """Extract file extension from filename."""
-    return Path(filename).suffix.lower()
+    """Extract file extension from filename (same result as Path(filename).suffix.lower())."""
+    name = filename.rstrip("/").rpartition("/")[2]
+    i = name.rfind(".")
+    if i <= 0 or i == len(name) - 1:
+        return ""
+    return name[i:].lower()
+
+
+def _url_key(url: str) -> str:
+    """Fixed-size cache key for a URL."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _static_media_exists(path: str) -> bool:
+    """Check that a /static/media/ path still exists on disk."""
+    prefix = "/static/media/"
+    return path.startswith(prefix) and (MEDIA_DIR / path[len(prefix):]).exists()
 
 
 async def download_image_from_url(url: str) -> Optional[str]:
     """
     Download an image from a URL and save it locally.
 
+    Repeated URLs reuse the previously saved file, and concurrent calls
+    for the same URL wait on a single download.
+
     Args:
         url: The URL of the image to download
 
     Returns:
-        Relative path to the saved file (e.g., "/static/media/image_uuid.jpg")
+        Relative path to the saved file (e.g., "/static/media/image_<sha256[:16]>.jpg")
         or None if download failed
     """
+    key = _url_key(url)
+
+    cached = _downloaded_paths.get(key)
+    if cached is not None:
+        if _static_media_exists(cached):
+            _downloaded_paths.move_to_end(key)
+            return cached
+        del _downloaded_paths[key]
+
+    inflight = _inflight_downloads.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight_downloads[key] = future
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, follow_redirects=True)
+        local_path = await _download_image(url)
+        if local_path:
+            _downloaded_paths[key] = local_path
+            if len(_downloaded_paths) > DOWNLOAD_CACHE_SIZE:
+                _downloaded_paths.popitem(last=False)
+        future.set_result(local_path)
+        return local_path
+    except BaseException:
+        # Cancelled mid-download: waiters fall back to the original URL
+        future.set_result(None)
+        raise
+    finally:
+        del _inflight_downloads[key]
+
+
+async def _download_image(url: str) -> Optional[str]:
+    """
+    Download an image from a URL and save it locally.
+
+    Args:
+        url: The URL of the image to download
+
+    Returns:
+        Relative path to the saved file (e.g., "/static/media/image_<sha256[:16]>.jpg")
+        or None if download failed
+    """
+    filepath = None
+    try:
+        client = _get_http_client()
+        async with client.stream("GET", url) as response:
             response.raise_for_status()
 
+            # Reject oversized images before reading the body
+            content_length = response.headers.get("content-length")
+            if content_length and content_length.isdigit() and int(content_length) > MAX_DOWNLOAD_BYTES:
+                raise ValueError(f"Image is {content_length} bytes (limit {MAX_DOWNLOAD_BYTES})")
+
             # Determine file extension from content-type or URL
             content_type = response.headers.get("content-type", "")
-            if "image/jpeg" in content_type or "image/jpg" in content_type:
-                ext = ".jpg"
-            elif "image/png" in content_type:
-                ext = ".png"
-            elif "image/gif" in content_type:
-                ext = ".gif"
-            elif "image/webp" in content_type:
-                ext = ".webp"
-            elif "image/svg" in content_type:
-                ext = ".svg"
-            else:
+            ext = CONTENT_TYPE_EXTENSIONS.get(content_type.split(";", 1)[0].strip().lower())
+            if not ext:
                 # Try to get extension from URL
                 ext = get_file_extension(url.split("?")[0])
                 if ext not in ALLOWED_EXTENSIONS:
                     ext = ".jpg"  # Default
 
-            # Generate unique filename
-            filename = f"image_{uuid.uuid4()}{ext}"
-            filepath = MEDIA_DIR / filename
-
-            # Save the file
+            # Stream the body to a temp file in fixed-size chunks, hashing as we go.
+            # Chunks are gathered and flushed with one writev per WRITE_BATCH_BYTES.
+            filepath = MEDIA_DIR / f".download_{_random_token()}.tmp"
+            _ensure_dir(filepath.parent)
+            hasher = hashlib.sha256()
+            written = 0
+            pending = []
+            pending_bytes = 0
             with open(filepath, "wb") as f:
-                f.write(response.content)
-
-            return f"/static/media/{filename}"
+                async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > MAX_DOWNLOAD_BYTES:
+                        raise ValueError(f"Image exceeds {MAX_DOWNLOAD_BYTES} bytes")
+                    hasher.update(chunk)
+                    pending.append(chunk)
+                    pending_bytes += len(chunk)
+                    if pending_bytes >= WRITE_BATCH_BYTES:
+                        _write_chunks(f, pending)
+                        pending.clear()
+                        pending_bytes = 0
+                _write_chunks(f, pending)
+
+        # Name the file by its content so repeated images share one copy
+        filename = _store_content_addressed(filepath, hasher.hexdigest(), "image", ext)
+        return f"/static/media/{filename}"
 
     except Exception as e:
-        print(f"Error downloading image from {url}: {e}")
+        logger.exception(f"❌ Error downloading image from {url}: {e}")
+        # Don't leave a partial file behind
+        if filepath is not None:
+            filepath.unlink(missing_ok=True)
         return None
 
 
@@ -114,25 +437,40 @@ async def save_uploaded_file(file: UploadFile) -> Optional[str]:
 
     Returns:
         Relative path to the saved file or None if save failed
+
+    Raises:
+        UnsupportedMediaTypeError: If the file's contents are not the image type its name claims
     """
+    tmp_path = None
     try:
         # Validate file extension
         ext = get_file_extension(file.filename)
         if ext not in ALLOWED_EXTENSIONS:
-            raise ValueError(f"File type {ext} not allowed. Allowed types: {ALLOWED_EXTENSIONS}")
-
-        # Generate unique filename
-        filename = f"upload_{uuid.uuid4()}{ext}"
-        filepath = MEDIA_DIR / filename
-
-        # Save the file
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            raise ValueError(f"File type {ext} not allowed. Allowed types: {', '.join(sorted(ALLOWED_EXTENSIONS))}")
+
+        # Verify the contents match the extension before anything touches disk
+        header = await file.read(MAGIC_HEADER_SIZE)
+        await file.seek(0)
+        detected = detect_image_extension(header)
+        if detected is None or (detected != ext and not {detected, ext} <= _JPEG_EXTENSIONS):
+            raise UnsupportedMediaTypeError(
+                f"File contents of {file.filename} do not match a {ext} image"
+            )
+
+        # Save the file off the event loop, then name it by its content
+        tmp_path = MEDIA_DIR / f".upload_{_random_token()}.tmp"
+        _ensure_dir(tmp_path.parent)
+        digest = await run_file_io(_copy_upload, file.file, tmp_path)
+        filename = _store_content_addressed(tmp_path, digest, "upload", ext)
 
         return f"/static/media/{filename}"
 
+    except UnsupportedMediaTypeError:
+        raise
     except Exception as e:
-        print(f"Error saving uploaded file: {e}")
+        logger.exception(f"❌ Error saving uploaded file: {e}")
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
         return None
     finally:
         file.file.close()
@@ -146,7 +484,7 @@ async def copy_local_file_to_media(file_path: str) -> Optional[str]:
         file_path: Relative or absolute path to local file
 
     Returns:
-        Relative path (e.g., "/static/media/image_uuid.jpg") or None if failed
+        Relative path (e.g., "/static/media/image_<token>.jpg") or None if failed
     """
     try:
         # Resolve path (handle both relative and absolute)
@@ -157,27 +495,28 @@ async def copy_local_file_to_media(file_path: str) -> Optional[str]:
             source_path = BASE_DIR / file_path
 
         if not source_path.exists():
-            print(f"❌ Local file not found: {source_path}")
+            logger.warning(f"❌ Local file not found: {source_path}")
             return None
 
         # Validate file extension
         ext = get_file_extension(source_path.name)
         if ext not in ALLOWED_EXTENSIONS:
-            print(f"❌ File type {ext} not allowed: {source_path}")
+            logger.warning(f"❌ File type {ext} not allowed: {source_path}")
             return None
 
         # Generate unique filename
-        filename = f"image_{uuid.uuid4()}{ext}"
+        filename = f"image_{_random_token()}{ext}"
         dest_path = MEDIA_DIR / filename
+        _ensure_dir(dest_path.parent)
 
         # Copy file
-        shutil.copy2(source_path, dest_path)
-        print(f"✅ Copied local file: {file_path} → {dest_path}")
+        await run_file_io(_copy_file, source_path, dest_path)
+        logger.info(f"✅ Copied local file: {file_path} → {dest_path}")
 
         return f"/static/media/{filename}"
 
     except Exception as e:
-        print(f"❌ Error copying local file {file_path}: {e}")
+        logger.exception(f"❌ Error copying local file {file_path}: {e}")
         return None
 
 
@@ -215,24 +554,46 @@ async def process_image_path(path: str) -> str:
     return path
 
 
+async def process_image_paths(
+    paths: List[Optional[str]],
+    max_concurrency: int = IMAGE_PROCESS_CONCURRENCY
+) -> List[Optional[str]]:
+    """
+    Process several image paths concurrently (see process_image_path).
+    Each distinct path is processed once, at most max_concurrency at a time;
+    empty entries pass through and the returned list preserves input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def process(path: str) -> str:
+        async with semaphore:
+            return await process_image_path(path)
+
+    unique_paths = list(dict.fromkeys(path for path in paths if path))
+    processed = dict(zip(unique_paths, await asyncio.gather(*[process(path) for path in unique_paths])))
+
+    return [processed.get(path, path) for path in paths]
+
+
 def delete_file(path: str) -> bool:
     """
     Delete a file from the filesystem.
 
+    Downloaded and uploaded media are content-addressed, so one file may back
+    several products; only call this once nothing references the path.
+
     Args:
-        path: Relative path starting with /static/media/ or /static/posts/
+        path: Relative path starting with /static/media/, /static/posts/ or /static/moods/
 
     Returns:
         True if successful, False otherwise
     """
     try:
         # Convert relative path to absolute
-        if path.startswith("/static/media/"):
-            filename = path.replace("/static/media/", "")
-            filepath = MEDIA_DIR / filename
-        elif path.startswith("/static/posts/"):
-            filename = path.replace("/static/posts/", "")
-            filepath = POSTS_DIR / filename
+        for prefix, directory in _PREFIX_TO_DIR.items():
+            if path.startswith(prefix):
+                filepath = _safe_join(directory, path[len(prefix):])
+                break
         else:
             return False
 
@@ -242,10 +603,22 @@ def delete_file(path: str) -> bool:
         return False
 
     except Exception as e:
-        print(f"Error deleting file {path}: {e}")
+        logger.exception(f"❌ Error deleting file {path}: {e}")
         return False
 
 
+def _drop_from_page_cache(f) -> None:
+    """
+    Flush a just-written file and advise the kernel to drop its pages, so large
+    single-use writes don't evict hotter data. No-op where posix_fadvise is unavailable.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    f.flush()
+    os.fsync(f.fileno())
+    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
 def save_mood_image(image_data: bytes, filename: str) -> str:
     """
     Save mood board image to /files/moods/ directory.
@@ -258,7 +631,9 @@ def save_mood_image(image_data: bytes, filename: str) -> str:
         Relative path (e.g., "moods/Summer2025_img_20250111_143022_1-1.png")
     """
     try:
-        filepath = MOODS_DIR / filename
+        filename = os.path.basename(filename)
+        filepath = _safe_join(MOODS_DIR, filename)
+        _ensure_dir(filepath.parent)
 
         with open(filepath, "wb") as f:
             f.write(image_data)
@@ -281,10 +656,14 @@ def save_mood_video(video_data: bytes, filename: str) -> str:
         Relative path (e.g., "moods/Summer2025_vid_20250111_143022_16-9.mp4")
     """
     try:
-        filepath = MOODS_DIR / filename
+        filename = os.path.basename(filename)
+        filepath = _safe_join(MOODS_DIR, filename)
+        _ensure_dir(filepath.parent)
 
         with open(filepath, "wb") as f:
             f.write(video_data)
+            if len(video_data) >= LARGE_WRITE_BYTES:
+                _drop_from_page_cache(f)
 
         return f"moods/{filename}"
 
@@ -301,50 +680,64 @@ def delete_mood_file(file_path: str) -> bool:
     try:
         # Handle both formats: "moods/file.png" and "/static/moods/file.png"
         if file_path.startswith("/static/moods/"):
-            clean_path = file_path.replace("/static/moods/", "")
+            clean_path = file_path[len("/static/moods/"):]
         elif file_path.startswith("moods/"):
-            clean_path = file_path.replace("moods/", "")
+            clean_path = file_path[len("moods/"):]
         else:
             clean_path = file_path
 
-        filepath = MOODS_DIR / clean_path
+        filepath = _safe_join(MOODS_DIR, clean_path)
 
         if filepath.exists():
             filepath.unlink()
-            print(f"✓ Deleted mood file: {file_path}")
+            logger.info(f"✓ Deleted mood file: {file_path}")
             return True
 
-        print(f"⚠️ Mood file not found: {file_path}")
+        logger.warning(f"⚠️ Mood file not found: {file_path}")
         return False
 
     except Exception as e:
-        print(f"Error deleting mood file {file_path}: {e}")
+        logger.exception(f"❌ Error deleting mood file {file_path}: {e}")
         return False
 
 
-async def save_generated_product_image(image, product_name: str) -> str:
+def _write_bytes(filepath: Path, data: bytes) -> None:
+    with open(filepath, "wb") as f:
+        f.write(data)
+
+
+async def save_generated_product_image(image, product_name: str, raw_png_bytes: Optional[bytes] = None) -> str:
     """
     Save a generated product image to /files/media/ directory.
     Args:
-        image: PIL Image object to save
+        image: PIL Image object to save (may be None when raw_png_bytes is given)
         product_name: Product name (will be sanitized for filename)
+        raw_png_bytes: Original encoded image bytes; if already PNG they are written
+            as-is, skipping a decode/re-encode round-trip
     Returns:
         Relative path (e.g., "/static/media/product_Tent_abc123.png")
     """
     try:
         # Sanitize product name for filename
         # Remove special characters, replace spaces with underscores, lowercase
-        sanitized_name = re.sub(r'[^\w\s-]', '', product_name)
-        sanitized_name = re.sub(r'[-\s]+', '_', sanitized_name)
+        sanitized_name = _SPECIAL_CHARS_RE.sub('', product_name)
+        sanitized_name = _SEPARATORS_RE.sub('_', sanitized_name)
         sanitized_name = sanitized_name.strip('_')[:30]  # Max 30 chars
 
         # Generate unique filename
-        filename = f"product_{sanitized_name}_{uuid.uuid4().hex[:8]}.png"
+        filename = f"product_{sanitized_name}_{_random_token(4)}.png"
         filepath = MEDIA_DIR / filename
+        _ensure_dir(filepath.parent)
 
-        # Save the PIL Image
-        image.save(filepath, format='PNG', quality=95)
-        print(f"✅ Saved generated product image: {filename}")
+        if raw_png_bytes is not None and detect_image_extension(raw_png_bytes[:MAGIC_HEADER_SIZE]) == ".png":
+            # Already PNG: write the bytes directly
+            await run_file_io(_write_bytes, filepath, raw_png_bytes)
+        else:
+            if image is None:
+                image = Image.open(io.BytesIO(raw_png_bytes))
+            # Save the PIL Image
+            await run_file_io(functools.partial(image.save, filepath, format='PNG', quality=95))
+        logger.info(f"✅ Saved generated product image: {filename}")
 
         return f"/static/media/{filename}"
 
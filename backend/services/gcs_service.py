@@ -43,6 +43,7 @@ class GCSService:
         """Initialize GCS client if enabled."""
         self.enabled = GCS_ENABLED
         self.bucket_name = GCS_BUCKET_NAME
+        self._uri_prefix = f"gs://{GCS_BUCKET_NAME}/"  # gs://bucket/moods/file.png -> moods/file.png
         self.client = None
         self.bucket = None
 
@@ -129,11 +130,11 @@ class GCSService:
         try:
             # Extract blob path from URI
             # gs://bucket/moods/file.png -> moods/file.png
-            if not gcs_uri.startswith(f"gs://{self.bucket_name}/"):
+            if not gcs_uri.startswith(self._uri_prefix):
                 logger.warning(f"  Invalid GCS URI format: {gcs_uri}")
                 return False
 
-            blob_path = gcs_uri.replace(f"gs://{self.bucket_name}/", "")
+            blob_path = gcs_uri[len(self._uri_prefix):]
             blob = self.bucket.blob(blob_path)
 
             # Delete blob
@@ -161,11 +162,11 @@ class GCSService:
         try:
             # Extract blob path from URI
             # gs://bucket/moods/file.png -> moods/file.png
-            if not gcs_uri.startswith(f"gs://{self.bucket_name}/"):
+            if not gcs_uri.startswith(self._uri_prefix):
                 logger.warning(f"Invalid GCS URI format: {gcs_uri}")
                 return None
 
-            blob_path = gcs_uri.replace(f"gs://{self.bucket_name}/", "")
+            blob_path = gcs_uri[len(self._uri_prefix):]
             blob = self.bucket.blob(blob_path)
 
             # Download blob
@@ -9,21 +9,30 @@ import re
 import logging
 import asyncio
 import os
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Union
+import httpx
 from google import genai
 from google.genai import types
 from PIL import Image
 import io
+from functools import lru_cache
 
 from .config import get_settings
 
-# Configure logging
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 ##################################################
 # Global Variables
 ##################################################
+# Connection pool for the genai async transport (long-lived, shared by all requests)
+GEMINI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60)
+
+# Concurrent Gemini calls when fanning out one base image to several aspect ratios,
+# and retry policy when those calls hit the quota (backoff: 10s, 20s, ...)
+ASPECT_RATIO_CONCURRENCY = 5
+QUOTA_RETRY_ATTEMPTS = 3
+QUOTA_BACKOFF_SECONDS = 10
+
 DIMENSIONS_MAP = {
     "1:1": "1080x1080 pixels (square)",
     "16:9": "1920x1080 pixels (landscape)",
@@ -198,6 +207,18 @@ IMPORTANT: Focus on creating a professional, marketable product image that
 would work well in advertising campaigns."""
 
 
+def _is_quota_error(error: Exception) -> bool:
+    """
+    Check whether a Gemini error is a rate/quota rejection (HTTP 429 / RESOURCE_EXHAUSTED).
+    Wrapped errors are unwrapped through __cause__, since the service re-raises with "from".
+    """
+    while error is not None:
+        if getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error):
+            return True
+        error = error.__cause__
+    return False
+
+
 def extract_image_from_response(
     response,
     return_bytes: bool = False,
@@ -255,8 +276,13 @@ class GeminiService:
                 "Please add your API key to backend/.env file."
             )
 
-        # Create client for new google-genai SDK
-        self.client = genai.Client(api_key=api_key)
+        # Create client for new google-genai SDK with an explicit keep-alive pool
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(async_client_args={"limits": GEMINI_HTTP_LIMITS})
+        )
+        # Native async surface of the same client; awaiting it keeps the event loop free
+        self.aio = self.client.aio
 
         # Model names for reference
         self.text_model_name = text_model_name
@@ -291,7 +317,7 @@ class GeminiService:
         )
         try:
             # Generate Text Content With Gemini
-            response = self.client.models.generate_content(
+            response = await self.aio.models.generate_content(
                 model=self.text_model_name,
                 contents=system_prompt
             )
@@ -363,7 +389,7 @@ class GeminiService:
             ##################################################
             # Generate New Post With Gemini
             ##################################################
-            response = self.client.models.generate_content(
+            response = await self.aio.models.generate_content(
                 model=self.image_model_name,
                 contents=[image_prompt, product_image],
                 config=types.GenerateContentConfig(
@@ -405,7 +431,7 @@ class GeminiService:
 
         try:
             # Generate New Aspect Ratio With Gemini img2img
-            response = self.client.models.generate_content(
+            response = await self.aio.models.generate_content(
                 model=self.image_model_name,
                 contents=[adaptation_prompt, base_image],
                 config=types.GenerateContentConfig(
@@ -425,7 +451,39 @@ class GeminiService:
 
         except Exception as _:
             logger.error(f"❌ Image adaptation failed: {str(_)}")
-            raise Exception(f"Failed to adapt image: {str(_)}")
+            raise Exception(f"Failed to adapt image: {str(_)}") from _
+
+    async def generate_all_aspect_ratios(
+        self,
+        base_image: Image.Image,
+        headline: str,
+        ratios: Sequence[str] = ("1:1", "16:9", "9:16")
+    ) -> List[Union[Image.Image, BaseException]]:
+        """
+        Adapt one base image to several aspect ratios concurrently.
+        At most ASPECT_RATIO_CONCURRENCY calls run at once; quota errors are retried
+        with exponential backoff. Results follow the order of ratios, and a ratio
+        that still fails is returned as its exception rather than cancelling the rest.
+        """
+        semaphore = asyncio.Semaphore(ASPECT_RATIO_CONCURRENCY)
+
+        async def adapt(ratio: str) -> Image.Image:
+            for attempt in range(QUOTA_RETRY_ATTEMPTS):
+                try:
+                    async with semaphore:
+                        return await self.generate_product_image_adaptation(
+                            base_image=base_image,
+                            headline=headline,
+                            new_aspect_ratio=ratio
+                        )
+                except Exception as e:
+                    if attempt == QUOTA_RETRY_ATTEMPTS - 1 or not _is_quota_error(e):
+                        raise
+                    delay = QUOTA_BACKOFF_SECONDS * 2 ** attempt
+                    logger.warning(f"⚠️ Gemini quota hit adapting to {ratio}, retrying in {delay}s")
+                    await asyncio.sleep(delay)
+
+        return await asyncio.gather(*(adapt(ratio) for ratio in ratios), return_exceptions=True)
 
     def _build_adaptation_prompt(
         self,
@@ -475,12 +533,44 @@ class GeminiService:
         Generate mood board image with Gemini 2.5 Flash Image.
         Creates inspirational creative material for mood boards without text overlays.
         """
-        logger.info(f"Generating mood board image ({aspect_ratio}).")
+        images = await self.generate_mood_images(
+            prompt=prompt,
+            source_images=source_images,
+            aspect_ratios=[aspect_ratio]
+        )
+        return images[0]
+
+    async def generate_mood_images(
+        self,
+        prompt: str,
+        source_images: list,
+        aspect_ratios: List[str]
+    ) -> List[bytes]:
+        """
+        Generate one mood board image per aspect ratio from the same sources.
+        Source images are loaded and encoded once and shared by all requests,
+        which are issued concurrently.
+        """
+        logger.info(f"Generating mood board images ({', '.join(aspect_ratios)}).")
+
+        image_parts = self._load_source_image_parts(source_images)
+
+        # Combine system prompt with user prompt
+        full_prompt = MOOD_BOARD_FULL_PROMPT.format(
+            system_prompt=MOOD_BOARD_SYSTEM_PROMPT,
+            prompt=prompt
+        )
 
-        # Build mood board specific system prompt
-        system_prompt = MOOD_BOARD_SYSTEM_PROMPT
+        results = await asyncio.gather(*(
+            self._compose_mood_image(full_prompt, image_parts, aspect_ratio)
+            for aspect_ratio in aspect_ratios
+        ))
+        return list(results)
 
-        # Load source images as PIL Images
+    def _load_source_image_parts(self, source_images: list) -> List[types.Part]:
+        """
+        Load source images from disk and encode each one once as a PNG part.
+        """
         image_parts = []
         failed_images = []
 
@@ -504,7 +594,13 @@ class GeminiService:
                 for path in possible_paths:
                     if os.path.exists(path):
                         with Image.open(path) as img:
-                            image_parts.append(img.copy())
+                            if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                                img = img.convert("RGB")
+                            buffer = io.BytesIO()
+                            img.save(buffer, format='PNG')
+                        image_parts.append(
+                            types.Part.from_bytes(data=buffer.getvalue(), mime_type="image/png")
+                        )
                         logger.info(f"  ✓ Loaded source image: {img_path}")
                         loaded = True
                         break
@@ -523,15 +619,20 @@ class GeminiService:
                 f"Generation aborted. Failed images: {', '.join(failed_images)}"
             )
 
-        # Combine system prompt with user prompt
-        full_prompt = MOOD_BOARD_FULL_PROMPT.format(
-            system_prompt=system_prompt,
-            prompt=prompt
-        )
+        return image_parts
 
+    async def _compose_mood_image(
+        self,
+        full_prompt: str,
+        image_parts: List[types.Part],
+        aspect_ratio: str
+    ) -> bytes:
+        """
+        Run a single mood board generation request for one aspect ratio.
+        """
         try:
             # Generate with Gemini 2.5 Flash Image
-            response = self.client.models.generate_content(
+            response = await self.aio.models.generate_content(
                 model=self.image_model_name,
                 contents=[full_prompt] + image_parts,
                 config=types.GenerateContentConfig(
@@ -546,7 +647,7 @@ class GeminiService:
             return extract_image_from_response(
                 response,
                 return_bytes=True,
-                success_message="Mood image generated successfully"
+                success_message=f"Mood image generated successfully ({aspect_ratio})"
             )
 
         except Exception as _:
@@ -557,10 +658,12 @@ class GeminiService:
         self,
         product_name: str,
         product_description: Optional[str] = None,
-        user_prompt: Optional[str] = None
-    ) -> Image.Image:
+        user_prompt: Optional[str] = None,
+        return_bytes: bool = False
+    ) -> Union[Image.Image, bytes]:
         """
         Generate a product image from text description using img2img transformation.
+        Returns a PIL Image, or the encoded image bytes as returned by Gemini if return_bytes=True.
         Since Gemini Flash Image doesn't support pure text-to-image, this method:
         1. Creates a neutral gray base template (1080x1080)
         2. Uses img2img to transform it into a professional product photo
@@ -584,7 +687,7 @@ class GeminiService:
             )
 
             # Step 3: Use img2img to transform template into product photo
-            response = self.client.models.generate_content(
+            response = await self.aio.models.generate_content(
                 model=self.image_model_name,
                 contents=[generation_prompt, base_template],
                 config=types.GenerateContentConfig(
@@ -598,7 +701,7 @@ class GeminiService:
             # Step 4: Extract generated image from response
             generated_image = extract_image_from_response(
                 response,
-                return_bytes=False,
+                return_bytes=return_bytes,
                 success_message="Product image generated!"
             )
             return generated_image
@@ -706,7 +809,7 @@ class GeminiService:
                     reference_type="asset"
                 )
 
-                operation = self.client.models.generate_videos(
+                operation = await self.aio.models.generate_videos(
                     model=veo_model,
                     prompt=enhanced_prompt,
                     config=types.GenerateVideosConfig(
@@ -716,7 +819,7 @@ class GeminiService:
                 )
             else:
                 logger.info("  🎬 Calling Veo API (prompt-only, no reference image)...")
-                operation = self.client.models.generate_videos(
+                operation = await self.aio.models.generate_videos(
                     model=veo_model,
                     prompt=enhanced_prompt,
                     config=types.GenerateVideosConfig(
@@ -735,7 +838,7 @@ class GeminiService:
                 attempts += 1
 
                 # Refresh operation status
-                operation = self.client.operations.get(operation)
+                operation = await self.aio.operations.get(operation)
 
                 if attempts % 6 == 0:  # Log every 30 seconds
                     logger.info(f"  Still generating... ({attempts * 5}s elapsed)")
@@ -747,9 +850,35 @@ class GeminiService:
 
             # Download the video
             video = operation.response.generated_videos[0]
-            video_data = self.client.files.download(file=video.video)
+            video_data = await asyncio.to_thread(self.client.files.download, file=video.video)
             return video_data
 
         except Exception as _:
             logger.error(f"❌ Video generation failed: {str(_)}")
             raise Exception(f"Failed to generate mood video: {str(_)}")
+
+
+@lru_cache()
+def get_gemini_service() -> GeminiService:
+    """
+    Get the shared GeminiService instance.
+
+    Reuses one genai client (and its connection pool) across requests
+    instead of building a new client per call.
+
+    Returns:
+        GeminiService: Singleton service instance
+    """
+    return GeminiService()
+
+
+async def close_gemini_client() -> None:
+    """
+    Close the shared genai async client, if one was created. Called on application shutdown.
+    """
+    if not get_gemini_service.cache_info().currsize:
+        return
+    aclose = getattr(get_gemini_service().aio, "aclose", None)
+    if aclose is not None:
+        await aclose()
+    get_gemini_service.cache_clear()
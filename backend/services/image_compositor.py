@@ -5,15 +5,67 @@ Uses PIL/Pillow to composite product images, brand elements, and text overlays
 into professionally designed post images for multiple aspect ratios.
 """
 import re
+import asyncio
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
-from PIL import Image, ImageDraw
+from typing import List, Optional
+from PIL import Image, ImageDraw, ImageFilter
 import httpx
 
-# Configure logging
+try:
+    import pyvips  # Optional: streaming thumbnails via libvips
+except ImportError:
+    pyvips = None
+
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+
+# Longest edge and JPEG quality of the thumbnail variant saved next to each post image
+THUMBNAIL_MAX_SIZE = 540
+THUMBNAIL_QUALITY = 85
+
+# Variant generation runs in worker processes; the semaphore bounds in-flight jobs (and memory)
+_variant_pool: Optional[ProcessPoolExecutor] = None
+_variant_semaphore = asyncio.Semaphore(4)
+
+
+def _get_variant_pool() -> ProcessPoolExecutor:
+    """
+    Create the variant worker pool on first use.
+    Workers are spawned rather than forked, since the server already runs threads.
+    """
+    global _variant_pool
+    if _variant_pool is None:
+        _variant_pool = ProcessPoolExecutor(
+            max_workers=2,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _variant_pool
+
+
+async def shutdown_variant_pool() -> None:
+    """Let in-flight variant jobs finish and stop the worker processes. Called on application shutdown."""
+    global _variant_pool
+    if _variant_pool is not None:
+        await asyncio.to_thread(_variant_pool.shutdown, wait=True)
+        _variant_pool = None
+
+
+def _write_thumbnail(source: str, dest: str, max_size: int, quality: int) -> None:
+    """
+    Write a JPEG thumbnail of source to dest (runs in a worker process).
+    Uses libvips when available (shrink-on-load, streaming), otherwise Pillow.
+    """
+    if pyvips is not None:
+        thumbnail = pyvips.Image.thumbnail(source, max_size, height=max_size)
+        thumbnail.write_to_file(dest, Q=quality)
+        return
+
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        image.save(dest, 'JPEG', quality=quality)
 
 
 class ImageCompositor:
@@ -28,6 +80,9 @@ class ImageCompositor:
         "9:16": (1080, 1920)      # Story/Vertical
     }
 
+    # Largest size a source image needs to be decoded at before it is sent to Gemini
+    SOURCE_DRAFT_SIZE = (1024, 1024)
+
     def __init__(self):
         """
         Initialize the image compositor.
@@ -37,6 +92,20 @@ class ImageCompositor:
         self.posts_dir = self.files_dir / "posts"
         self.posts_dir.mkdir(parents=True, exist_ok=True)
 
+    @classmethod
+    def open_source_image(cls, path: Path) -> Image.Image:
+        """
+        Open and decode a source image for generation.
+
+        For JPEGs, libjpeg is asked to downscale during decode (DCT scaling),
+        which avoids materializing full-resolution pixels for large photos.
+        """
+        image = Image.open(path)
+        if image.format == "JPEG":
+            image.draft("RGB", cls.SOURCE_DRAFT_SIZE)
+        image.load()
+        return image
+
     async def create_post_image(
         self,
         aspect_ratio: str,
@@ -44,7 +113,8 @@ class ImageCompositor:
         brand_logo: Optional[str],
         campaign_name: str,
         post_headline: str,
-        output_filename: str
+        output_filename: str,
+        png_compress_level: int = 6
     ) -> str:
         """
         Create a post image from Gemini-generated image with logo and border.
@@ -56,6 +126,7 @@ class ImageCompositor:
             campaign_name: Campaign name for folder organization
             post_headline: Post headline for folder naming
             output_filename: Filename for the output image (e.g., "image_1-1.png")
+            png_compress_level: zlib level for the PNG encoder (0-9, lower is faster)
         """
         if aspect_ratio not in self.CANVAS_SIZES:
             raise ValueError(f"Invalid aspect ratio: {aspect_ratio}. Must be one of {list(self.CANVAS_SIZES.keys())}")
@@ -89,11 +160,64 @@ class ImageCompositor:
         canvas = self._add_border(canvas)
 
         # Save image
-        output_path = self._save_image(canvas, campaign_name, post_headline, output_filename)
+        output_path = await asyncio.to_thread(
+            self._save_image, canvas, campaign_name, post_headline, output_filename, png_compress_level
+        )
         logger.info(f"      Image saved to: {output_path}")
 
         return output_path
 
+    def reframe(self, base: Image.Image, target_ratio: str) -> Image.Image:
+        """
+        Reframe an already generated image to another aspect ratio locally.
+
+        The whole base image is fitted inside the target canvas (so the headline
+        Gemini rendered is never cropped away) and the leftover space is filled
+        with a blurred, cover-cropped copy of the same image.
+        """
+        if target_ratio not in self.CANVAS_SIZES:
+            raise ValueError(f"Invalid aspect ratio: {target_ratio}. Must be one of {list(self.CANVAS_SIZES.keys())}")
+
+        target_width, target_height = self.CANVAS_SIZES[target_ratio]
+        base = base.convert('RGB')
+
+        # Background: cover-crop the base image and blur it heavily
+        background = self._resize_cover_crop(base, target_width, target_height)
+        background = background.filter(ImageFilter.GaussianBlur(radius=40))
+
+        # Foreground: scale the base image to fit entirely within the canvas
+        scale = min(target_width / base.width, target_height / base.height)
+        fit_size = (int(base.width * scale), int(base.height * scale))
+        foreground = base.resize(fit_size, Image.Resampling.LANCZOS)
+
+        # Center the foreground on the blurred background
+        x = (target_width - foreground.width) // 2
+        y = (target_height - foreground.height) // 2
+        background.paste(foreground, (x, y))
+
+        return background
+
+    async def create_variants(self, image_paths: List[str]) -> None:
+        """
+        Persist a JPEG thumbnail next to each saved post image.
+
+        Intended to run as a background task after the response is sent.
+        Example: posts/{folder}/image_1-1.png -> posts/{folder}/image_1-1_thumb.jpg
+        """
+        loop = asyncio.get_running_loop()
+
+        for image_path in image_paths:
+            source = self.files_dir / image_path
+            dest = source.with_name(f"{source.stem}_thumb.jpg")
+            try:
+                async with _variant_semaphore:
+                    await loop.run_in_executor(
+                        _get_variant_pool(), _write_thumbnail,
+                        str(source), str(dest), THUMBNAIL_MAX_SIZE, THUMBNAIL_QUALITY
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to create thumbnail for {image_path}: {e}")
+
     async def _add_brand_overlay(self, canvas: Image.Image, brand_path: str, aspect_ratio: str) -> Image.Image:
         """
         Add brand logo as small overlay/watermark.
@@ -194,7 +318,14 @@ class ImageCompositor:
             local_path = self.files_dir / image_path.lstrip('/static/')
             return Image.open(local_path)
 
-    def _save_image(self, canvas: Image.Image, campaign_name: str, headline: str, filename: str) -> str:
+    def _save_image(
+        self,
+        canvas: Image.Image,
+        campaign_name: str,
+        headline: str,
+        filename: str,
+        compress_level: int = 6
+    ) -> str:
         """
         Save final post image (Gemini-generated with logo and border).
         Path format: posts/{CampaignName}_{PostHeadline}/image_{aspectRatio}.png
@@ -210,7 +341,7 @@ class ImageCompositor:
 
         # Save image
         output_file = output_dir / filename
-        canvas.save(output_file, 'PNG', quality=95)
+        canvas.save(output_file, 'PNG', compress_level=compress_level, optimize=False)
 
         # Return relative path
         return f"posts/{folder_name}/{filename}"
@@ -5,6 +5,7 @@ Handles AI generation with Gemini for images and Veo for videos,
 file management, and metadata tracking.
 """
 import re
+import asyncio
 import json
 import uuid
 import logging
@@ -13,12 +14,51 @@ from pathlib import Path
 from typing import List
 from sqlalchemy.orm import Session
 
-from models.orm import MoodMedia, Campaign
-from services.gemini_service import GeminiService
+from models.orm import MoodMedia, Campaign, Product
+from services.gemini_service import get_gemini_service
 from services import file_manager
+from services.cache import AVAILABLE_IMAGES_CACHE
 
 logger = logging.getLogger(__name__)
 
+# Campaign-name sanitizing patterns, compiled once
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+
+def get_available_images(campaign_id: str, db: Session) -> dict:
+    """
+    Get the selectable source images for a campaign (products + mood board images).
+
+    Selects only the columns the picker renders and caches the result
+    (invalidated on product/mood writes, see services.cache).
+    """
+    cached = AVAILABLE_IMAGES_CACHE.get(campaign_id)
+    if cached is not None:
+        return cached
+
+    # Get products for this campaign
+    products = db.query(Product.id, Product.name, Product.image_path)\
+        .filter(Product.campaign_id == campaign_id)\
+        .all()
+
+    # Get existing mood images (exclude videos)
+    mood_images = db.query(MoodMedia.id, MoodMedia.file_path, MoodMedia.aspect_ratio)\
+        .filter(MoodMedia.campaign_id == campaign_id)\
+        .filter(MoodMedia.media_type == "image")\
+        .all()
+
+    logger.info(f"  ✓ Found {len(products)} products, {len(mood_images)} mood images")
+
+    response = {
+        "products": [row._asdict() for row in products],
+        "mood_images": [row._asdict() for row in mood_images]
+    }
+    AVAILABLE_IMAGES_CACHE[campaign_id] = response
+
+    return response
+
 
 async def generate_mood_images(
     campaign_id: str,
@@ -35,36 +75,41 @@ async def generate_mood_images(
     logger.info(f"🎨 Generating {len(ratios)} mood images for campaign {campaign_id}")
 
     # Get campaign
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise ValueError(f"Campaign {campaign_id} not found")
 
     # Sanitize campaign name for filename
     campaign_name = sanitize_campaign_name(campaign.name, max_len=20)
 
-    # Create Gemini service instance
-    gemini_service = GeminiService()
-
-    results = []
+    # Shared Gemini service instance
+    gemini_service = get_gemini_service()
 
-    for ratio in ratios:
-        logger.info(f"  🖼️ Generating image for ratio {ratio}...")
-
-        # Generate image with Gemini
-        image_data = await gemini_service.generate_mood_image(
-            prompt=prompt,
-            source_images=source_images,
-            aspect_ratio=ratio
-        )
+    # Generate all ratios concurrently (source images are loaded once)
+    logger.info(f"  🖼️ Generating images for ratios {ratios}...")
+    images_data = await gemini_service.generate_mood_images(
+        prompt=prompt,
+        source_images=source_images,
+        aspect_ratios=ratios
+    )
 
-        # Create unique filename with date stamp
-        date_stamp = get_date_stamp()
-        filename = f"{campaign_name}_img_{date_stamp}_{ratio.replace(':', '-')}.png"
+    # Create unique filenames with date stamp
+    date_stamp = get_date_stamp()
+    filenames = [
+        f"{campaign_name}_img_{date_stamp}_{ratio.replace(':', '-')}.png"
+        for ratio in ratios
+    ]
+
+    # Save all images locally in parallel worker threads
+    file_paths = await asyncio.gather(*(
+        file_manager.run_file_io(file_manager.save_mood_image, image_data, filename)
+        for image_data, filename in zip(images_data, filenames)
+    ))
+    logger.info(f"  ✅ Saved locally: {', '.join(file_paths)}")
 
-        # Save image locally
-        file_path = file_manager.save_mood_image(image_data, filename)
-        logger.info(f"  ✅ Saved locally: {file_path}")
+    results = []
 
+    for ratio, file_path in zip(ratios, file_paths):
         # Create DB entry
         mood_media = MoodMedia(
             id=str(uuid.uuid4()),
@@ -107,15 +152,15 @@ async def generate_mood_video(
     logger.info(f"🎬 Generating mood video for campaign {campaign_id} ({ratio}, {duration}s)")
 
     # Get campaign
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise ValueError(f"Campaign {campaign_id} not found")
 
     # Sanitize campaign name for filename
     campaign_name = sanitize_campaign_name(campaign.name, max_len=20)
 
-    # Create Gemini service instance
-    gemini_service = GeminiService()
+    # Shared Gemini service instance
+    gemini_service = get_gemini_service()
 
     # Verify reference images exist
     if source_images:
@@ -146,7 +191,7 @@ async def generate_mood_video(
     filename = f"{campaign_name}_vid_{date_stamp}_{ratio.replace(':', '-')}.mp4"
 
     # Save video locally
-    file_path = file_manager.save_mood_video(video_data, filename)
+    file_path = await file_manager.run_file_io(file_manager.save_mood_video, video_data, filename)
     logger.info(f"  ✅ Saved locally: {file_path}")
 
     # Create DB entry
@@ -212,11 +257,11 @@ def sanitize_campaign_name(name: str, max_len: int = 20) -> str:
     and truncates to max length.
     """
     # Remove special characters
-    safe = re.sub(r'[^\w\s-]', '', name)
+    safe = _SPECIAL_CHARS_RE.sub('', name)
     # Replace spaces with underscores
-    safe = re.sub(r'\s+', '_', safe)
+    safe = _WHITESPACE_RE.sub('_', safe)
     # Remove consecutive underscores
-    safe = re.sub(r'_+', '_', safe)
+    safe = _UNDERSCORES_RE.sub('_', safe)
     # Truncate to max length
     return safe.strip('_')[:max_len]
 